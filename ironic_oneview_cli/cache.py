@@ -0,0 +1,252 @@
+# Copyright (2015-2017) Hewlett Packard Enterprise Development LP
+# Copyright (2015-2017) Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import errno
+import json
+import os
+import shutil
+import threading
+import time
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL = 300
+
+
+def get_cache_dir():
+    """Directory holding the files cached between command runs."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'ironic-oneview-cli')
+
+
+def read_json(path):
+    """Read a JSON file, returning None if it is missing or corrupted."""
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    """Atomically write a JSON file only readable by its owner."""
+    temp_path, json_file = _open_temp(path)
+    with json_file:
+        json.dump(data, json_file)
+    os.rename(temp_path, path)
+
+
+def _open_temp(path):
+    """Open a temporary file, only readable by its owner, next to a path."""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError as ex:
+        if ex.errno != errno.EEXIST:
+            raise
+
+    temp_path = '%s.%s.%s' % (
+        path, os.getpid(), threading.current_thread().ident)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(temp_path, 0o600)
+    return temp_path, os.fdopen(fd, 'w')
+
+
+class ResourceCache(object):
+    """In-memory LRU cache of resources keyed by URI.
+
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``max_size`` entries are stored. Errors accepted by
+    ``is_negative`` are cached as well, so a missing resource is only
+    requested once.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL,
+                 is_negative=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.is_negative = is_negative or (lambda error: False)
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Get the resource for a key, loading it on a miss.
+
+        :param key: the resource URI.
+        :param loader: callable receiving the key and returning the resource.
+        :returns: the cached or freshly loaded resource.
+        :raises: the error raised by the loader, also for cached negatives.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if entry is None:
+            try:
+                entry = (loader(key), None)
+            except Exception as ex:
+                if not self.is_negative(ex):
+                    raise
+                entry = (None, ex)
+            self._store(key, entry)
+
+        value, error = entry
+        if error is not None:
+            raise error
+        return value
+
+    def set(self, key, value):
+        self._store(key, (value, None))
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry if no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        try:
+            expires_at, entry = self._entries.pop(key)
+        except KeyError:
+            return None
+        if self.ttl is not None and expires_at < time.time():
+            return None
+        # NOTE: re-inserting marks the entry as the most recently used.
+        self._entries[key] = (expires_at, entry)
+        return entry
+
+    def _store(self, key, entry):
+        expires_at = time.time() + (self.ttl or 0)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, entry)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class InventoryCache(object):
+    """On-disk cache of OneView collections.
+
+    A collection is served from disk until its TTL expires. It is then
+    revalidated with a cheap version check, and only downloaded again if
+    the version changed. The version of an entry is stored as
+    ``<directory>/<collection>/<variant>.json`` and its members, one JSON
+    document per line, as ``<variant>.members``, so members are streamed
+    to and from disk. The variant tells apart listings of the same
+    collection, e.g. with different filters.
+    """
+
+    def __init__(self, directory, refresh=False):
+        self.directory = directory
+        self.refresh = refresh
+
+    def get(self, collection, variant, loader, get_version, ttl):
+        """Get a collection, loading it when missing, expired or outdated.
+
+        :param collection: the collection name.
+        :param variant: a file name safe key of the listing.
+        :param loader: callable returning an iterable of the members.
+        :param get_version: callable returning a JSON serializable value
+            that changes whenever the collection changes.
+        :param ttl: seconds during which the cached members are served
+            without revalidation.
+        :returns: the list of members.
+        """
+        return list(self.iter(collection, variant, loader, get_version, ttl))
+
+    def iter(self, collection, variant, loader, get_version, ttl):
+        """Iterate over a collection, loading it when missing or outdated.
+
+        Takes the same arguments as get. The entry is checked right away,
+        but members are only read, or loaded and written, as they are
+        consumed. A loaded collection is only stored once it is consumed
+        entirely.
+
+        :returns: an iterator over the members.
+        """
+        path = self._get_path(collection, variant)
+        members_path = self._get_members_path(collection, variant)
+        entry = None if self.refresh else read_json(path)
+        now = time.time()
+
+        if isinstance(entry, dict) and os.path.exists(members_path):
+            if now < entry.get('expires_at', 0):
+                return self._read_members(members_path)
+            version = get_version()
+            if version == entry.get('version'):
+                entry['expires_at'] = now + ttl
+                write_json(path, entry)
+                return self._read_members(members_path)
+        else:
+            version = get_version()
+
+        # NOTE: the version is read before the members, so a change made in
+        # between is detected by the next revalidation.
+        return self._write_members(
+            path, members_path, {'version': version, 'expires_at': now + ttl},
+            loader())
+
+    @staticmethod
+    def _read_members(members_path):
+        with open(members_path) as members_file:
+            for line in members_file:
+                yield json.loads(line)
+
+    @staticmethod
+    def _write_members(path, members_path, entry, members):
+        temp_path, members_file = _open_temp(members_path)
+        stored = False
+        try:
+            with members_file:
+                for member in members:
+                    members_file.write(json.dumps(member) + '\n')
+                    yield member
+            os.rename(temp_path, members_path)
+            write_json(path, entry)
+            stored = True
+        finally:
+            if not stored and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def invalidate(self, collection=None):
+        """Drop the entries of a collection, or of every collection."""
+        if collection is None:
+            path = self.directory
+        else:
+            path = os.path.join(self.directory, collection)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _get_path(self, collection, variant):
+        return os.path.join(self.directory, collection, '%s.json' % variant)
+
+    def _get_members_path(self, collection, variant):
+        return os.path.join(
+            self.directory, collection, '%s.members' % variant)
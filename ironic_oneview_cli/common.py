@@ -15,7 +15,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from __future__ import print_function
+
+import collections
+from concurrent import futures
+import csv
+import itertools
+import json
 import os
+import sys
+import threading
 
 from builtins import input as builtin_input
 import re
@@ -26,15 +35,45 @@ from oslo_utils import encodeutils
 from oslo_utils import importutils
 import prettytable
 
-from ironicclient import client as ironic_client
-from keystoneauth1 import loading
-from keystoneauth1 import session
-from novaclient import client as nova_client
-
+from ironic_oneview_cli import credential_cache
 from ironic_oneview_cli import exceptions
 
-oneview_client = importutils.try_import('hpOneView.oneview_client')
-oneview_exceptions = importutils.try_import('hpOneView.exceptions')
+
+class LazyModule(object):
+    """A module imported on first attribute access.
+
+    Backend client libraries are slow to import, so they are referenced
+    through this proxy and only loaded by the commands that use them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importutils.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __bool__(self):
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    __nonzero__ = __bool__
+
+
+ironic_client = LazyModule('ironicclient.client')
+loading = LazyModule('keystoneauth1.loading')
+session = LazyModule('keystoneauth1.session')
+nova_client = LazyModule('novaclient.client')
+oneview_client = LazyModule('hpOneView.oneview_client')
+oneview_exceptions = LazyModule('hpOneView.exceptions')
 
 # NOTE(fellypefca): Classic Drivers will be deprecated on Openstack Queens
 SUPPORTED_DRIVERS = ['agent_pxe_oneview', 'iscsi_pxe_oneview', 'fake_oneview']
@@ -45,33 +84,29 @@ _is_valid_logical_name_re = re.compile(r'^[A-Z0-9-._~]+$', re.I)
 IRONIC_API_VERSION = 1
 NOVA_API_VERSION = 2
 
+DEFAULT_WORKERS = 10
 
-def get_ironic_client(args):
-    cli_kwargs = {
-        'ironic_url': args.ironic_url,
-        'os_username': args.os_username,
-        'os_password': args.os_password,
-        'os_auth_url': args.os_auth_url,
-        'os_project_id': args.os_project_id,
-        'os_project_name': args.os_project_name,
-        'os_tenant_name': args.os_tenant_name,
-        'os_region_name': args.os_region_name,
-        'os_service_type': args.os_service_type,
-        'os_endpoint_type': args.os_endpoint_type,
-        'insecure': args.insecure,
-        'os_cacert': args.os_cacert,
-        'os_cert': args.os_cert,
-        'os_ironic_api_version': args.ironic_api_version,
-        'os_project_domain_id': args.os_project_domain_id,
-        'os_project_domain_name': args.os_project_domain_name,
-        'os_user_domain_id': args.os_user_domain_id,
-        'os_user_domain_name': args.os_user_domain_name
-    }
+TABLE_FORMAT = 'table'
+OUTPUT_FORMATS = (TABLE_FORMAT, 'json', 'ndjson', 'csv')
 
-    return ironic_client.get_client(IRONIC_API_VERSION, **cli_kwargs)
+_keystone_session_lock = threading.Lock()
 
 
-def get_nova_client(args):
+def get_keystone_session(args):
+    """Get the Keystone session shared by the OpenStack clients.
+
+    The session is created once per command run and, when credential
+    caching is enabled, starts from the token cached by a previous run.
+    """
+    with _keystone_session_lock:
+        sess = getattr(args, 'keystone_session', None)
+        if sess is None:
+            sess = _create_keystone_session(args)
+            args.keystone_session = sess
+    return sess
+
+
+def _create_keystone_session(args):
     loader = loading.get_plugin_loader('password')
     auth = loader.load_from_options(
         auth_url=args.os_auth_url,
@@ -85,21 +120,76 @@ def get_nova_client(args):
         project_domain_name=args.os_project_domain_name
     )
 
+    cache = getattr(args, 'credential_cache', None)
+    if cache is not None:
+        key = credential_cache.get_cache_key(
+            args.os_auth_url, args.os_username, args.os_user_domain_id,
+            args.os_user_domain_name, args.os_project_id or args.os_tenant_id,
+            args.os_project_name or args.os_tenant_name,
+            args.os_project_domain_id, args.os_project_domain_name)
+        auth_state = cache.get(credential_cache.KEYSTONE, key)
+        if auth_state:
+            # NOTE: an expired token is renewed by keystoneauth before use
+            # and a revoked one is renewed on the first 401 response.
+            auth.set_auth_state(auth_state)
+        cache.track(credential_cache.KEYSTONE, key, auth.get_auth_state)
+
     verify = True
     if args.insecure:
         verify = False
     elif args.os_cacert:
         verify = args.os_cacert
 
-    sess = session.Session(auth=auth, verify=verify, cert=args.os_cert)
-    nova = nova_client.Client(NOVA_API_VERSION, session=sess)
+    return session.Session(auth=auth, verify=verify, cert=args.os_cert)
 
-    return nova
+
+def get_ironic_client(args):
+    cli_kwargs = {
+        'os_ironic_api_version': args.ironic_api_version,
+    }
+
+    if args.ironic_url:
+        cli_kwargs.update({
+            'ironic_url': args.ironic_url,
+            'os_username': args.os_username,
+            'os_password': args.os_password,
+            'os_auth_url': args.os_auth_url,
+            'os_project_id': args.os_project_id,
+            'os_project_name': args.os_project_name,
+            'os_tenant_name': args.os_tenant_name,
+            'os_region_name': args.os_region_name,
+            'os_service_type': args.os_service_type,
+            'os_endpoint_type': args.os_endpoint_type,
+            'insecure': args.insecure,
+            'os_cacert': args.os_cacert,
+            'os_cert': args.os_cert,
+            'os_project_domain_id': args.os_project_domain_id,
+            'os_project_domain_name': args.os_project_domain_name,
+            'os_user_domain_id': args.os_user_domain_id,
+            'os_user_domain_name': args.os_user_domain_name
+        })
+    else:
+        cli_kwargs.update({
+            'session': get_keystone_session(args),
+            'region_name': args.os_region_name,
+            'service_type': args.os_service_type,
+            'interface': args.os_endpoint_type
+        })
+
+    return ironic_client.get_client(IRONIC_API_VERSION, **cli_kwargs)
+
+
+def get_nova_client(args):
+    return nova_client.Client(
+        NOVA_API_VERSION, session=get_keystone_session(args))
 
 
 def get_hponeview_client(args):
     """Generate an instance of the HPE OneView client.
 
+    When credential caching is enabled, the session of a previous run is
+    reused and a full login is only done if OneView rejects it.
+
     :returns: an instance of the HPE OneView client.
     :raises: OneViewConnectionError if try a secure connection without a CA
              certificate file path in Ironic OneView CLI configuration file.
@@ -116,11 +206,11 @@ def get_hponeview_client(args):
     if insecure:
         print("Ironic OneView CLI is opening an insecure connection to "
               "HPE OneView. We recommend you to configure secure connections "
-              "with a CA certificate file.")
+              "with a CA certificate file.", file=sys.stderr)
 
         if ssl_certificate:
             print("Insecure connection to OneView, the CA certificate: %s "
-                  "will be ignored." % ssl_certificate)
+                  "will be ignored." % ssl_certificate, file=sys.stderr)
             ssl_certificate = None
 
     config = {
@@ -132,6 +222,23 @@ def get_hponeview_client(args):
         "ssl_certificate": ssl_certificate
     }
 
+    cache = getattr(args, 'credential_cache', None)
+    if cache is not None:
+        key = credential_cache.get_cache_key(
+            args.ov_auth_url, args.ov_username)
+        session_id = cache.get(credential_cache.ONEVIEW, key)
+        if session_id:
+            cached_config = dict(config, credentials=dict(
+                config["credentials"], sessionID=session_id))
+            try:
+                client = oneview_client.OneViewClient(cached_config)
+            except oneview_exceptions.HPOneViewException:
+                cache.invalidate(credential_cache.ONEVIEW, key)
+            else:
+                cache.track(credential_cache.ONEVIEW, key,
+                            client.connection.get_session_id)
+                return client
+
     try:
         client = oneview_client.OneViewClient(config)
     except oneview_exceptions.HPOneViewException as ex:
@@ -140,9 +247,162 @@ def get_hponeview_client(args):
               "error below:\n")
         raise ex
 
+    if cache is not None:
+        cache.track(credential_cache.ONEVIEW, key,
+                    client.connection.get_session_id)
+
     return client
 
 
+def iter_parallel(func, items, workers=DEFAULT_WORKERS):
+    """Apply a function to every item using a bounded pool of threads.
+
+    Items are consumed lazily and at most ``workers`` calls run at once.
+    An exception raised for one item does not stop the others.
+
+    :param func: callable receiving a single item.
+    :param items: iterable of items.
+    :param workers: maximum number of concurrent calls.
+    :returns: a generator of (item, result, error) tuples in item order,
+              where error is the exception raised by func or None.
+    """
+    if workers <= 1:
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as ex:
+                yield item, None, ex
+        return
+
+    pending = collections.deque()
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            # NOTE: keep a few items queued so the pool stays busy while
+            # the oldest outcome is being consumed.
+            if len(pending) > 2 * workers:
+                yield _get_outcome(*pending.popleft())
+        while pending:
+            yield _get_outcome(*pending.popleft())
+
+
+def _get_outcome(item, future):
+    error = future.exception()
+    if error is not None:
+        return item, None, error
+    return item, future.result(), None
+
+
+def parallel_map(func, items, workers=DEFAULT_WORKERS):
+    """Apply a function to every item using a bounded pool of threads.
+
+    :param func: callable receiving a single item.
+    :param items: iterable of items.
+    :param workers: maximum number of concurrent calls.
+    :returns: a list with the results in the same order as the items.
+    :raises: the first exception raised by func, in item order.
+    """
+    results = []
+    for _, result, error in iter_parallel(func, items, workers):
+        if error is not None:
+            raise error
+        results.append(result)
+    return results
+
+
+def iter_paginated(list_page, get_marker, page_size):
+    """Iterate over a collection listed one page at a time.
+
+    The first page is requested right away, and every following page as
+    soon as the previous one arrives, so it downloads while the items of the
+    current page are consumed. The last item of a page is the marker of the
+    next request and is only handed out once that request returned, so the
+    consumer can safely delete the items it gets.
+
+    :param list_page: callable receiving a marker, None for the first page,
+        and a page size, and returning a list of page size items, or fewer
+        only at the end of the collection.
+    :param get_marker: callable returning the marker of an item.
+    :param page_size: number of items requested per page.
+    :returns: an iterator over the items.
+    """
+    return _start_pages(
+        list_page, None, lambda marker, page: get_marker(page[-1]),
+        page_size)
+
+
+def iter_offset_paginated(list_page, page_size):
+    """Iterate over a collection listed one page at a time by offset.
+
+    Works like iter_paginated, but pages are requested by the position of
+    their first item.
+
+    :param list_page: callable receiving the position of the first item of
+        the page and a page size, and returning a list of page size items,
+        or fewer only at the end of the collection.
+    :param page_size: number of items requested per page.
+    :returns: an iterator over the items.
+    """
+    return _start_pages(
+        list_page, 0, lambda start, page: start + len(page), page_size)
+
+
+def _start_pages(list_page, marker, get_next_marker, page_size):
+    executor = futures.ThreadPoolExecutor(max_workers=1)
+    return _iter_pages(executor, executor.submit(list_page, marker, page_size),
+                       list_page, marker, get_next_marker, page_size)
+
+
+def _iter_pages(executor, future, list_page, marker, get_next_marker,
+                page_size):
+    try:
+        page = future.result()
+        while len(page) >= page_size:
+            marker = get_next_marker(marker, page)
+            future = executor.submit(list_page, marker, page_size)
+            for item in page[:-1]:
+                yield item
+            last_item = page[-1]
+            page = future.result()
+            yield last_item
+        for item in page:
+            yield item
+    finally:
+        executor.shutdown(wait=False)
+
+
+def call_with_timeout(timeout, func, *args, **kwargs):
+    """Call a function, giving up on it after a timeout.
+
+    The function runs in a daemon thread, so a call that never returns does
+    not keep the CLI from exiting.
+
+    :param timeout: maximum number of seconds to wait for the result.
+    :param func: the function to call with the remaining arguments.
+    :returns: the result of the function.
+    :raises: OperationTimeoutError if the function did not return in time,
+             or the exception raised by the function.
+    """
+    outcome = {}
+
+    def _run():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except Exception as ex:
+            outcome['error'] = ex
+
+    thread = threading.Thread(target=_run)
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise exceptions.OperationTimeoutError(
+            "Operation did not finish in %s seconds" % timeout)
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
 def get_uuid_from_uri(uri):
     if uri:
         return uri.split("/")[-1]
@@ -150,6 +410,22 @@ def get_uuid_from_uri(uri):
     raise exceptions.OneViewResourceNotFoundError(msg)
 
 
+def is_oneview_resource_not_found(error):
+    """Whether an error means that a OneView resource does not exist.
+
+    :param error: the exception raised by a OneView lookup.
+    :returns: True for missing resources, False for any other failure.
+    """
+    if isinstance(error, exceptions.OneViewResourceNotFoundError):
+        return True
+    if oneview_exceptions and isinstance(
+            error, oneview_exceptions.HPOneViewException):
+        response = error.oneview_response
+        return (isinstance(response, dict) and
+                response.get('errorCode') == 'RESOURCE_NOT_FOUND')
+    return False
+
+
 def arg(*args, **kwargs):
     """Decorator for CLI args.
 
@@ -228,10 +504,144 @@ def _print_list(objs, fields, sortby_index=0, field_labels=None):
                 row.append(data)
         pt.add_row(row)
 
+    _print_text(pt.get_string(**kwargs))
+
+
+def _print_text(text):
     if six.PY3:
-        print(encodeutils.safe_encode(pt.get_string(**kwargs)).decode())
+        print(encodeutils.safe_encode(text).decode())
     else:
-        print(encodeutils.safe_encode(pt.get_string(**kwargs)))
+        print(encodeutils.safe_encode(text))
+
+
+def print_stream(objs, fields, field_labels=None, page_size=100):
+    """Print objects as a table while they are still being listed.
+
+    The column widths are taken from the heading and the first page of
+    objects, so rows are printed as they arrive; a longer value in a later
+    row widens that row only.
+
+    :param objs: iterable of dicts
+    :param fields: keys that correspond to columns, in order
+    :param field_labels: Labels to use in the heading of the table, default to
+        fields.
+    :param page_size: number of objects the column widths are taken from.
+    """
+    field_labels = field_labels or fields
+    objs = iter(objs)
+    first_rows = [_get_row(o, fields)
+                  for o in itertools.islice(objs, page_size)]
+    widths = [max(len(value) for value in column)
+              for column in zip(field_labels, *first_rows)]
+
+    border = '+%s+' % '+'.join('-' * (width + 2) for width in widths)
+    _print_text(border)
+    _print_text(_format_row(field_labels, widths))
+    _print_text(border)
+    for row in first_rows:
+        _print_text(_format_row(row, widths))
+    for o in objs:
+        _print_text(_format_row(_get_row(o, fields), widths))
+    _print_text(border)
+
+
+def _get_row(obj, fields):
+    return [six.text_type(obj.get(field)) for field in fields]
+
+
+def _format_row(values, widths):
+    return '| %s |' % ' | '.join(
+        value.ljust(width) for value, width in zip(values, widths))
+
+
+def select_fields(selected_fields, fields, field_labels):
+    """Select the fields given to --fields, keeping their labels.
+
+    :param selected_fields: comma separated field names, or None for all the
+        fields.
+    :param fields: the fields that can be selected, in the default order.
+    :param field_labels: the labels of the fields.
+    :returns: a tuple with the selected fields and their labels.
+    :raises: CommandError if a selected field is not one of the fields.
+    """
+    if not selected_fields:
+        return fields, field_labels
+
+    selected_fields = [field.strip() for field in selected_fields.split(',')
+                       if field.strip()]
+    invalid_fields = [field for field in selected_fields
+                      if field not in fields]
+    if invalid_fields:
+        raise exceptions.CommandError(
+            "Invalid field(s): %(invalid)s. Valid fields are: %(valid)s" %
+            {'invalid': ', '.join(invalid_fields),
+             'valid': ', '.join(fields)})
+    labels = dict(zip(fields, field_labels))
+    return selected_fields, [labels[field] for field in selected_fields]
+
+
+def print_formatted(objs, fields, field_labels=None,
+                    output_format=TABLE_FORMAT, sortby_index=None):
+    """Print objects as a table, JSON, NDJSON or CSV.
+
+    Tables sorted by a column are printed once every object is known, other
+    tables as in print_stream. The other formats use the field names as
+    keys or header and write each row as soon as its object arrives.
+
+    :param objs: iterable of dicts
+    :param fields: keys that correspond to columns, in order
+    :param field_labels: Labels to use in the heading of a table, default to
+        fields.
+    :param output_format: one of OUTPUT_FORMATS.
+    :param sortby_index: index of the field for sorting table rows
+    """
+    if output_format == TABLE_FORMAT:
+        if sortby_index is None:
+            print_stream(objs, fields, field_labels)
+        else:
+            _print_list(objs, fields, sortby_index, field_labels)
+        return
+
+    rows = (collections.OrderedDict((field, o.get(field)) for field in fields)
+            for o in objs)
+    if output_format == 'json':
+        _write_json(rows)
+    elif output_format == 'ndjson':
+        _write_ndjson(rows)
+    else:
+        _write_csv(rows, fields)
+
+
+def _write_json(rows):
+    separator = '\n'
+    sys.stdout.write('[')
+    for row in rows:
+        sys.stdout.write(separator + json.dumps(row))
+        sys.stdout.flush()
+        separator = ',\n'
+    sys.stdout.write('\n]\n' if separator != '\n' else ']\n')
+    sys.stdout.flush()
+
+
+def _write_ndjson(rows):
+    for row in rows:
+        sys.stdout.write(json.dumps(row) + '\n')
+        sys.stdout.flush()
+
+
+def _write_csv(rows, fields):
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_get_csv_value(value) for value in row.values()])
+        sys.stdout.flush()
+
+
+def _get_csv_value(value):
+    # NOTE: the Python 2 csv module only writes byte strings.
+    if six.PY2 and isinstance(value, six.text_type):
+        return encodeutils.safe_encode(value)
+    return value
 
 
 def print_prompt(object_list, header_list, input_message=None,
@@ -248,44 +658,106 @@ def print_prompt(object_list, header_list, input_message=None,
     return None
 
 
+class IndexedList(list):
+    """A list of resources whose lookups by field are served from indexes.
+
+    The index of a field maps each value to the position of the first
+    element holding it. It is built on the first lookup of that field and
+    dropped whenever the list changes.
+    """
+
+    def __init__(self, iterable=()):
+        super(IndexedList, self).__init__(iterable)
+        self._indexes = {}
+
+    def find(self, field, value):
+        """Get the first element whose field has the given value, or None."""
+        position = self.position(field, value)
+        if position is None:
+            return None
+        return self[position]
+
+    def position(self, field, value):
+        index = self._indexes.get(field)
+        if index is None:
+            index = {}
+            for position, element in enumerate(self):
+                try:
+                    index.setdefault(_get_field(element, field), position)
+                except TypeError:
+                    # NOTE: unhashable values can not be looked up.
+                    pass
+            self._indexes[field] = index
+        try:
+            return index.get(value)
+        except TypeError:
+            return None
+
+    def reindex(self):
+        """Drop the indexes, e.g. after the elements themselves changed."""
+        self._indexes = {}
+
+
+def _reindexing(method_name):
+    method = getattr(list, method_name)
+
+    def _method(self, *args, **kwargs):
+        self.reindex()
+        return method(self, *args, **kwargs)
+    _method.__name__ = method_name
+    return _method
+
+
+for _method_name in ('__setitem__', '__delitem__', '__iadd__', '__imul__',
+                     '__setslice__', '__delslice__', 'append', 'extend',
+                     'insert', 'pop', 'remove', 'reverse', 'sort'):
+    if hasattr(list, _method_name):
+        setattr(IndexedList, _method_name, _reindexing(_method_name))
+
+
+def _get_field(obj, field):
+    if isinstance(obj, dict):
+        return obj.get(field, "")
+    return getattr(obj, field, "")
+
+
+def _as_indexed_list(element_list):
+    if isinstance(element_list, IndexedList):
+        return element_list
+    return IndexedList(element_list)
+
+
 def assign_elements_with_new_id(element_list):
     counter = 1
     for element in element_list:
         element['id'] = counter
         counter += 1
+    if isinstance(element_list, IndexedList):
+        element_list.reindex()
 
 
 def get_element_by_id(element_list, element_id):
     try:
-        for element in element_list:
-            if element['id'] == int(element_id):
-                return element
-        return None
+        return _as_indexed_list(element_list).find('id', int(element_id))
     except Exception:
         print("Failed to get element by id.")
 
 
 def get_element(element_list, element_uuid_name_uri):
-    def is_equal(obj, field, value):
-        if isinstance(obj, dict):
-            return obj.get(field, "") == value
-        return getattr(obj, field, "") == value
-
-    for element in element_list:
-        if (is_equal(element, 'uuid', element_uuid_name_uri) or
-                is_equal(element, 'name', element_uuid_name_uri) or
-                is_equal(element, 'uri', element_uuid_name_uri)):
-            return element
-
-    return None
+    elements = _as_indexed_list(element_list)
+    positions = [elements.position(field, element_uuid_name_uri)
+                 for field in ('uuid', 'name', 'uri')]
+    positions = [position for position in positions if position is not None]
+    if not positions:
+        return None
+    # NOTE: the first element matching any of the fields wins, as when the
+    # list was scanned.
+    return elements[min(positions)]
 
 
 def get_element_by_name(element_list, element_name):
     try:
-        for element in element_list:
-            if element['name'] == element_name:
-                return element
-        return None
+        return _as_indexed_list(element_list).find('name', element_name)
     except Exception:
         print("Failed to get element by name.")
 
@@ -293,6 +765,7 @@ def get_element_by_name(element_list, element_name):
 def is_entry_invalid(entries, objects_list):
     if not entries:
         return True
+    objects_list = _as_indexed_list(objects_list)
     for entry in entries:
         element = get_element_by_id(objects_list, entry)
         if element is None:
@@ -380,12 +853,12 @@ def approve_command_prompt(message):
 def get_oneview_nodes(ironic_nodes):
     """Get the nodes which drivers are compatible with OneView.
 
-    :param ironic_nodes: A list of Ironic Nodes
-    :returns: A list of Ironic Nodes with OneView compatible Drivers and
+    :param ironic_nodes: An iterable of Ironic Nodes
+    :returns: A generator of Ironic Nodes with OneView compatible Drivers and
               Hardware types only.
     """
     types = SUPPORTED_DRIVERS + SUPPORTED_HARDWARE_TYPES
-    return [i for i in ironic_nodes if i.driver in types]
+    return (i for i in ironic_nodes if i.driver in types)
 
 
 def is_server_profile_applied(server_hardware):
@@ -527,30 +1000,21 @@ def get_ilo_access(remote_console):
 def get_server_profile_compatible(server_profile_templates, server_hardware):
     """Get server profiles compatible with server hardware.
 
+    A template is compatible when at least one Server Hardware has both its
+    Server Hardware Type and its Enclosure Group.
+
     :param server_profile_templates: List of server profile templates
     :param server_hardware: Server Hardware object
     :return: List of server profiles templates compatible with server hardware
              sorted by name
     """
-    server_profile_list = []
-    server_hardware_type_list = []
-    server_group_list = []
-    for hardware in server_hardware:
-        server_hardware_type_list.append(
-            hardware.get('serverHardwareTypeUri'))
-        server_group_list.append(
-            hardware.get('serverGroupUri'))
-
-    for spt in server_profile_templates:
-        if (spt.get('serverHardwareTypeUri') in server_hardware_type_list and
-                spt.get('enclosureGroupUri') in server_group_list):
-            server_profile_list.append(spt)
+    hardware_configurations = set(
+        (hardware.get('serverHardwareTypeUri'), hardware.get('serverGroupUri'))
+        for hardware in server_hardware)
 
-    return sorted(server_profile_list, key=lambda x: x.get('name').lower())
+    server_profile_list = [
+        spt for spt in server_profile_templates
+        if (spt.get('serverHardwareTypeUri'),
+            spt.get('enclosureGroupUri')) in hardware_configurations]
 
-
-def is_valid_spt(server_profile_templates, template_uri):
-    valid = get_element(server_profile_templates, template_uri)
-    if valid is None:
-        return False
-    return True
+    return sorted(server_profile_list, key=lambda x: x.get('name').lower())
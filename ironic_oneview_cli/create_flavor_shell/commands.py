@@ -14,6 +14,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
 import re
 
 from ironic_oneview_cli import common
@@ -26,11 +27,12 @@ LOG = logging.getLogger(__name__)
 
 class FlavorCreator(object):
 
-    def __init__(self, facade_obj):
+    def __init__(self, facade_obj, workers=common.DEFAULT_WORKERS):
         self.facade = facade_obj
+        self.workers = workers
 
     def get_oneview_nodes(self):
-        return common.get_oneview_nodes(self.facade.get_ironic_node_list())
+        return common.get_oneview_nodes(self.facade.iter_oneview_nodes())
 
     def get_flavor_from_ironic_node(self, flavor_id, node):
         server_hardware_uri = node.driver_info.get("server_hardware_uri")
@@ -85,17 +87,42 @@ class FlavorCreator(object):
 
         return flavor
 
-    def get_flavor_list(self, nodes):
-        flavors = []
+    @staticmethod
+    def get_flavor_key(node):
+        """Get the node fields a flavor is derived from.
+
+        The capabilities hold the Server Hardware Type, Enclosure Group and
+        Server Profile Template URIs, so nodes with the same key lead to the
+        same flavor.
+        """
+        capabilities = node.properties.get('capabilities') or ''
+        return (
+            node.properties.get('memory_mb'),
+            node.properties.get('cpus'),
+            node.properties.get('local_gb'),
+            node.properties.get('cpu_arch'),
+            tuple(sorted(capabilities.split(',')))
+        )
 
-        id_counter = 1
+    def iter_flavor_nodes(self, nodes):
+        """Get the first node of each group of nodes with the same key."""
+        flavor_keys = set()
         for node in nodes:
             if node.properties.get('memory_mb'):
-                flavors.append(
-                    self.get_flavor_from_ironic_node(id_counter, node)
-                )
-                id_counter += 1
-        return sorted(set(flavors), key=lambda x: x.cpus)
+                flavor_key = self.get_flavor_key(node)
+                if flavor_key not in flavor_keys:
+                    flavor_keys.add(flavor_key)
+                    yield node
+
+    def get_flavor_list(self, nodes):
+        # NOTE: OneView is only queried for one node of each group, and the
+        # groups are resolved concurrently, as soon as the nodes listing
+        # reaches them.
+        flavors = common.parallel_map(
+            lambda group: self.get_flavor_from_ironic_node(*group),
+            enumerate(self.iter_flavor_nodes(nodes), 1), self.workers)
+        return sorted(
+            set(flavors), key=lambda x: (x.cpus, x.ram_mb, repr(x)))
 
     def create_flavor(self, flavor_name, flavor):
         attrs = {
@@ -131,29 +158,32 @@ def do_flavor_create(args):
     it's ID.
     """
     cli_facade = facade.Facade(args)
-    flavor_creator = FlavorCreator(cli_facade)
-    nodes = flavor_creator.get_oneview_nodes()
-
+    flavor_creator = FlavorCreator(cli_facade, args.workers)
     if args.name and not args.node:
         print("It is mandatory to specify an Ironic Node for flavor creation. "
               "Use --node")
         return
-    elif not nodes:
+
+    nodes = flavor_creator.get_oneview_nodes()
+    first_node = next(nodes, None)
+    if first_node is None:
         print("No Ironic nodes running OneView drivers were found. "
               "Please, create a node to be used as base for the flavor.")
         return
 
     LOG.info("Retrieving possible configurations for flavor creation...")
+    nodes = itertools.chain([first_node], nodes)
     if args.node:
-        nodes = [common.get_element(nodes, args.node)]
+        nodes = [common.get_element(list(nodes), args.node)]
         if nodes[0] is None:
             print("Could not find an Ironic Node matching '%s'"
                   % args.node)
             return
 
+    cli_facade.preload_reference_data()
     flavor_list = flavor_creator.get_flavor_list(nodes)
 
-    flavor_dict_list = []
+    flavor_dict_list = common.IndexedList()
     for flavor in flavor_list:
         flavor_dict_list.append(flavor.__dict__)
         flavor_dict_list[-1]["flavor_obj"] = flavor
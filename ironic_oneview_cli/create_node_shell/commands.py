@@ -15,61 +15,144 @@
 #    under the License.
 
 import sys
+import threading
 
 from ironic_oneview_cli import common
 from ironic_oneview_cli.create_port_shell import commands as port_cmd
 from ironic_oneview_cli import facade
 
+# NOTE: the attributes node creation reads from a Server Hardware.
+NODE_FIELDS = ['local_gb', 'cpu_arch']
+
+# NOTE: the fields naming Enclosure Groups and Server Hardware Types, which
+# are only listed when one of these fields is printed.
+REFERENCE_FIELDS = ['enclosure_group_name', 'server_hardware_type_name']
+
 
 class NodeCreator(object):
-    def __init__(self, facade_obj):
+    # NOTE: the attributes set on OneView objects, in the order they are set.
+    ATTRIBUTES = ('local_gb', 'cpu_arch', 'uuid', 'cpus', 'memory_mb',
+                  'enclosure_group_name', 'server_hardware_type_name',
+                  'enrolled')
+
+    def __init__(self, facade_obj, workers=common.DEFAULT_WORKERS):
         self.facade = facade_obj
+        self.workers = workers
+        self._enrollment_index = None
+        self._enrollment_lock = threading.Lock()
 
     def get_oneview_nodes(self):
-        return common.get_oneview_nodes(self.facade.get_ironic_node_list())
+        return common.get_oneview_nodes(self.facade.iter_oneview_nodes())
 
     @staticmethod
     def is_server_profile_applied(server_hardware):
         return bool(server_hardware.get('serverProfileUri'))
 
+    def get_enrollment_index(self):
+        """Map each enrolled Server Hardware URI to its Ironic node.
+
+        The index is built from a single Ironic node listing the first time
+        it is needed and kept up to date by create_node afterwards.
+
+        :returns: a dict of server_hardware_uri -> Ironic node.
+        """
+        with self._enrollment_lock:
+            if self._enrollment_index is None:
+                enrollment_index = {}
+                for node in self.get_oneview_nodes():
+                    server_hardware_uri = node.driver_info.get(
+                        'server_hardware_uri')
+                    if server_hardware_uri:
+                        enrollment_index[server_hardware_uri] = node
+                self._enrollment_index = enrollment_index
+        return self._enrollment_index
+
     def is_enrolled_on_ironic(self, server_hardware):
-        nodes = self.get_oneview_nodes()
-        return any(
-            node.driver_info.get('server_hardware_uri') == server_hardware.get(
-                'uri') for node in nodes)
-
-    def set_attributes_to_object(self, oneview_object_list):
-        for oneview_object in oneview_object_list:
-            enclosure_group_uri = oneview_object.get('enclosureGroupUri')
-            server_group_uri = oneview_object.get("serverGroupUri")
-            enclosure_group = self.facade.get_enclosure_group(
-                enclosure_group_uri or server_group_uri)
-
-            server_hardware_type = self.facade.get_server_hardware_type(
-                oneview_object.get('serverHardwareTypeUri'))
-            processor_core_count = oneview_object.get("processorCoreCount", 0)
-            processor_count = oneview_object.get("processorCount", 0)
-
-            # Here comes the infamous HACK of local_gb and cpu_arch
-            oneview_object["local_gb"] = 120
-            oneview_object["cpu_arch"] = 'x86_64'
-
-            oneview_object["uuid"] = common.get_uuid_from_uri(
-                oneview_object.get("uri"))
-
-            oneview_object["cpus"] = processor_core_count * processor_count
-            oneview_object["memory_mb"] = common.get_attribute_from_dict(
-                oneview_object, "memoryMb")
-
-            oneview_object["enclosure_group_name"] = (
-                common.get_attribute_from_dict(enclosure_group, 'name'))
-            oneview_object["server_hardware_type_name"] = (
-                common.get_attribute_from_dict(server_hardware_type, 'name'))
-
-            oneview_object['enrolled'] = self.is_enrolled_on_ironic(
-                oneview_object)
+        return server_hardware.get('uri') in self.get_enrollment_index()
+
+    def set_attributes_to_object(self, oneview_object_list, fields=None):
+        """Set the attributes of OneView objects.
+
+        :param oneview_object_list: list of OneView object dicts.
+        :param fields: the fields, e.g. table columns, the objects are
+            needed for; only the attributes among them are set. All
+            attributes are set if None.
+        """
+        common.parallel_map(
+            lambda oneview_object: self._set_attributes(
+                oneview_object, fields),
+            oneview_object_list, self.workers)
+        if isinstance(oneview_object_list, common.IndexedList):
+            oneview_object_list.reindex()
+
+    def iter_with_attributes(self, oneview_objects, fields=None):
+        """Set the attributes of OneView objects as they are being listed.
+
+        :param oneview_objects: iterable of OneView object dicts.
+        :param fields: as in set_attributes_to_object.
+        :returns: a generator of the objects, in the same order.
+        """
+        for oneview_object, _, error in common.iter_parallel(
+                lambda oneview_object: self._set_attributes(
+                    oneview_object, fields),
+                oneview_objects, self.workers):
+            if error is not None:
+                raise error
+            yield oneview_object
+
+    def _set_attributes(self, oneview_object, fields=None):
+        # NOTE: each attribute has its own getter, so attributes that are
+        # not needed do not cost OneView or Ironic requests.
+        for attribute in self.ATTRIBUTES:
+            if fields is None or attribute in fields:
+                getter = getattr(self, '_get_%s' % attribute)
+                oneview_object[attribute] = getter(oneview_object)
 
-    def get_server_hardware_list(self, server_profile_template):
+    @staticmethod
+    def _get_local_gb(oneview_object):
+        # Here comes the infamous HACK of local_gb and cpu_arch
+        return 120
+
+    @staticmethod
+    def _get_cpu_arch(oneview_object):
+        return 'x86_64'
+
+    @staticmethod
+    def _get_uuid(oneview_object):
+        return common.get_uuid_from_uri(oneview_object.get("uri"))
+
+    @staticmethod
+    def _get_cpus(oneview_object):
+        processor_core_count = oneview_object.get("processorCoreCount", 0)
+        processor_count = oneview_object.get("processorCount", 0)
+        return processor_core_count * processor_count
+
+    @staticmethod
+    def _get_memory_mb(oneview_object):
+        return common.get_attribute_from_dict(oneview_object, "memoryMb")
+
+    def _get_enclosure_group_name(self, oneview_object):
+        enclosure_group_uri = oneview_object.get('enclosureGroupUri')
+        server_group_uri = oneview_object.get("serverGroupUri")
+        enclosure_group = self.facade.get_enclosure_group(
+            enclosure_group_uri or server_group_uri)
+        return common.get_attribute_from_dict(enclosure_group, 'name')
+
+    def _get_server_hardware_type_name(self, oneview_object):
+        server_hardware_type = self.facade.get_server_hardware_type(
+            oneview_object.get('serverHardwareTypeUri'))
+        return common.get_attribute_from_dict(server_hardware_type, 'name')
+
+    def _get_enrolled(self, oneview_object):
+        return self.is_enrolled_on_ironic(oneview_object)
+
+    def iter_server_hardware(self, server_profile_template):
+        """Iterate over the Server Hardware matching a template, by name.
+
+        :param server_profile_template: a template dict, or an empty dict
+            for every Server Hardware.
+        :returns: an iterator over Server Hardware dicts.
+        """
         selected_sht_uri = server_profile_template.get(
             'serverHardwareTypeUri'
         )
@@ -80,33 +163,123 @@ class NodeCreator(object):
 
         if selected_eg_uri:
             enclosure_group_uri = "serverGroupUri='%s'" % selected_eg_uri
-            server_hardware_list = (
-                self.facade.filter_server_hardware_available(
-                    [enclosure_group_uri, hardware_type_uri]))
+            return self.facade.iter_server_hardware(
+                [enclosure_group_uri, hardware_type_uri])
         elif selected_sht_uri:
             # NOTE(fellypefca): Rack Servers are not in any enclosure
-            server_hardware_list = (
-                self.facade.filter_server_hardware_available(
-                    [hardware_type_uri]))
-        else:
-            server_hardware_list = (
-                self.facade.filter_server_hardware_available())
-        return sorted(
-            server_hardware_list, key=lambda x: x.get('name').lower())
+            return self.facade.iter_server_hardware([hardware_type_uri])
+        return self.facade.iter_server_hardware()
 
-    def create_node(self, args, server_hardware, server_profile_template):
+    def get_server_hardware_list(self, server_profile_template):
+        return common.IndexedList(sorted(
+            self.iter_server_hardware(server_profile_template),
+            key=lambda x: x.get('name').lower()))
+
+    def create_nodes(self, args, server_hardware_list,
+                     server_profile_template):
+        """Create Ironic nodes for many Server Hardware concurrently.
+
+        Server Hardware already enrolled on Ironic, or listed more than once,
+        are skipped. At most self.workers enrollments run at once and the
+        progress of each one is printed in the order of the given list.
+
+        :param args: the node-create arguments.
+        :param server_hardware_list: list of Server Hardware dicts.
+        :param server_profile_template: the Server Profile Template dict.
+        :returns: a tuple with the list of created nodes and a list of
+                  (server_hardware, error) tuples for the failed ones.
+        """
+        def _create(server_hardware):
+            if self.is_enrolled_on_ironic(server_hardware):
+                return None
+            return self._enroll_server_hardware(
+                args, server_hardware, server_profile_template, port_creator)
+
+        unique_server_hardware = []
+        seen_uris = set()
+        for server_hardware in server_hardware_list:
+            if server_hardware.get('uri') not in seen_uris:
+                seen_uris.add(server_hardware.get('uri'))
+                unique_server_hardware.append(server_hardware)
+
+        port_creator = port_cmd.PortCreator(
+            self.facade, index_ports=len(unique_server_hardware) > 1)
+
+        # NOTE: Server Hardware is listed without its port map, which is
+        # only fetched for the Server Hardware being enrolled, also to
+        # validate a given MAC. The iLOs of the ones without a port map are
+        # then queried all at once, and the MACs reused by each enrollment.
+        # A Server Hardware that could not be fetched is fetched again, and
+        # its failure reported, by its own enrollment.
+        not_enrolled_server_hardware = [
+            server_hardware for server_hardware in unique_server_hardware
+            if not self.is_enrolled_on_ironic(server_hardware)]
+        self.facade.load_server_hardware_port_maps(
+            not_enrolled_server_hardware, self.workers)
+        self.facade.get_server_hardware_macs_from_ilo(
+            [server_hardware
+             for server_hardware in not_enrolled_server_hardware
+             if 'portMap' in server_hardware and
+             not server_hardware.get('portMap')],
+            self.workers)
+
+        created_nodes = []
+        failures = []
+        for server_hardware, outcome, error in common.iter_parallel(
+                _create, unique_server_hardware, self.workers):
+            if error is not None:
+                print('Failed to create a node for the Server Hardware '
+                      '%(sh)s: %(error)s' % {'sh': server_hardware.get('name'),
+                                             'error': error})
+                failures.append((server_hardware, error))
+                continue
+            if outcome is None:
+                print('Server Hardware %s is already enrolled on Ironic.' %
+                      server_hardware.get('name'))
+                continue
+
+            node, port, port_error = outcome
+            if self.is_server_profile_applied(server_hardware):
+                print('The Server Hardware %s is in use by OneView.' %
+                      server_hardware.get('name'))
+            print('Node %s was created!' % node.uuid)
+            if port:
+                print("Port %s was created" % port.uuid)
+            elif port_error is not None:
+                print('Failed to create a port for the node %(node)s: '
+                      '%(error)s' % {'node': node.uuid, 'error': port_error})
+                failures.append((server_hardware, port_error))
+            created_nodes.append(node)
+
+        if created_nodes:
+            # NOTE: the cached Server Hardware listings are dropped once for
+            # the whole batch.
+            self.facade.invalidate_inventory('server-hardware')
+        print('%(created)s node(s) created, %(failed)s failure(s).' %
+              {'created': len(created_nodes), 'failed': len(failures)})
+        return created_nodes, failures
+
+    def _enroll_server_hardware(self, args, server_hardware,
+                                server_profile_template, port_creator):
+        self._set_attributes(server_hardware, NODE_FIELDS)
         attrs = self._create_attrs_for_node(
             args, server_hardware, server_profile_template)
         common.update_attrs_for_node(attrs, args, server_hardware)
         node = self.facade.create_ironic_node(**attrs)
-
-        port_creator = port_cmd.PortCreator(self.facade)
-        port = port_creator.create_port(args, node)
-
-        if port:
-            print("Port %s was created" % port.uuid)
-
-        return node
+        self.get_enrollment_index()[server_hardware.get('uri')] = node
+
+        try:
+            errors = self.facade.load_server_hardware_port_maps(
+                [server_hardware], 1)
+            if errors:
+                raise errors[server_hardware.get('uri')]
+            # NOTE: the Server Hardware is already known, so it is not
+            # requested again from OneView.
+            port = port_creator.create_port_for_server_hardware(
+                node, server_hardware, args.mac)
+        except Exception as ex:
+            return node, None, ex
+        return node, port, None
 
     @staticmethod
     def _create_attrs_for_node(
@@ -163,7 +336,15 @@ class NodeCreator(object):
 def do_node_create(args):
     """Create nodes based on available HPE OneView Objects."""
     facade_obj = facade.Facade(args)
-    node_creator = NodeCreator(facade_obj)
+    try:
+        _node_create(args, facade_obj)
+    finally:
+        facade_obj.logout_ilo_sessions()
+
+
+def _node_create(args, facade_obj):
+    facade_obj.preload_reference_data()
+    node_creator = NodeCreator(facade_obj, args.workers)
 
     try:
         server_hardware = (
@@ -177,29 +358,27 @@ def do_node_create(args):
     server_hardware_list = [server_hardware] if server_hardware else None
 
     try:
-        spt_list = facade_obj.list_templates_compatible(server_hardware_list)
+        spt_list = common.IndexedList(
+            facade_obj.list_templates_compatible(server_hardware_list))
     except Exception:
         print(("Unable to retrieve Server Profile Template '%s'")
               % args.server_profile_template)
         return
 
-    node_creator.set_attributes_to_object(spt_list)
     common.assign_elements_with_new_id(spt_list)
 
     if not args.server_profile_template:
-        template_selected = _interactive_template(spt_list)
+        template_selected = _interactive_template(node_creator, spt_list)
     else:
-        templates = facade_obj.list_all_templates()
-        node_creator.set_attributes_to_object(templates)
+        template = facade_obj.find_server_profile_template(
+            args.server_profile_template)
 
-        if not common.is_valid_spt(templates, (args.server_profile_template)):
+        if template is None:
             print(("Server Profile template is not valid '%s'")
                   % args.server_profile_template)
             return
 
-        template_selected = common.get_element(
-            spt_list, args.server_profile_template
-        )
+        template_selected = spt_list.find('uri', template.get('uri'))
 
         if not template_selected:
             print(("Server Hardware '%s' does not match the Server Hardware "
@@ -207,8 +386,14 @@ def do_node_create(args):
                   % (args.server_hardware_uuid, args.server_profile_template))
             return
 
-    s_hardware_list = node_creator.get_server_hardware_list(template_selected)
-    node_creator.set_attributes_to_object(s_hardware_list)
+    if server_hardware:
+        # NOTE: the templates were matched against this Server Hardware
+        # already, so the other Server Hardware are not listed.
+        s_hardware_list = common.IndexedList([server_hardware])
+    else:
+        s_hardware_list = node_creator.get_server_hardware_list(
+            template_selected)
+    node_creator.set_attributes_to_object(s_hardware_list, ['uuid'])
     common.assign_elements_with_new_id(s_hardware_list)
 
     passed_server_hardware = None
@@ -231,16 +416,18 @@ def do_node_create(args):
     if args.number and not passed_server_hardware:
         print(("Creating %(number_of_nodes)s nodes with the specific "
                "Server Hardware") % {'number_of_nodes': args.number})
+        fields = [
+            'cpus',
+            'memory_mb',
+            'local_gb',
+            'cpu_arch',
+            'enclosure_group_name',
+            'server_hardware_type_name'
+        ]
+        node_creator.set_attributes_to_object([s_hardware_list[0]], fields)
         common.print_prompt(
             [s_hardware_list[0]],
-            [
-                'cpus',
-                'memory_mb',
-                'local_gb',
-                'cpu_arch',
-                'enclosure_group_name',
-                'server_hardware_type_name'
-            ],
+            fields,
             field_labels=[
                 'CPUs',
                 'Memory MB',
@@ -251,32 +438,15 @@ def do_node_create(args):
             ]
         )
 
-        nodes_created = 0
-        for node_index in range(args.number):
-            node = common.get_element_by_id(s_hardware_list, node_index + 1)
-
-            if not node:
-                print("{} nodes created.".format(nodes_created))
-                break
-            elif node_creator.is_enrolled_on_ironic(node):
-                print(('Server Hardware %(server_hardware)s is already '
-                       'enrolled on Ironic.') % {'server_hardware':
-                                                 node.get("uuid")})
-            else:
-                if node_creator.is_server_profile_applied(node):
-                    print(('Server Hardware %(server_hardware)s is in use by '
-                           'OneView.') % {'server_hardware':
-                                          node.get("uuid")})
-
-                node_creator.create_node(args, node, template_selected)
-                nodes_created += 1
+        node_creator.create_nodes(
+            args, s_hardware_list[:args.number], template_selected)
 
         print('Node Creation Finished.')
 
     else:
         if not passed_server_hardware:
             selected_server_hardware_list = _interactive_server_hardware(
-                s_hardware_list)
+                node_creator, s_hardware_list)
         else:
             selected_server_hardware_list = [passed_server_hardware]
 
@@ -287,29 +457,49 @@ def do_node_create(args):
                       template_selected)
 
 
+@common.arg(
+    '--format',
+    dest='output_format',
+    choices=common.OUTPUT_FORMATS,
+    default=common.TABLE_FORMAT,
+    help='Output format: table, json, ndjson or csv. Defaults to table.')
+@common.arg(
+    '--fields',
+    metavar='<field>[,<field>...]',
+    help='Comma separated fields to print: uuid, name, '
+         'enclosure_group_name and server_hardware_type_name. Defaults to '
+         'all of them.')
 def do_server_profile_template_list(args):
     """List Server Profile Templates of HPE OneView."""
-    facade_obj = facade.Facade(args)
-    node_creator = NodeCreator(facade_obj)
-
-    spt_list = facade_obj.list_templates_compatible()
-    node_creator.set_attributes_to_object(spt_list)
-
-    common.print_prompt(
-        spt_list,
+    fields, field_labels = common.select_fields(
+        args.fields,
         [
             'uuid',
             'name',
             'enclosure_group_name',
             'server_hardware_type_name'
         ],
-        field_labels=[
+        [
             'UUID',
             'Name',
             'Enclosure Group Name',
             'Server Hardware Type Name'
-        ],
-        sortby_index=1
+        ]
+    )
+
+    facade_obj = facade.Facade(args)
+    _preload_reference_data(facade_obj, fields)
+    node_creator = NodeCreator(facade_obj, args.workers)
+
+    spt_list = facade_obj.list_templates_compatible()
+    node_creator.set_attributes_to_object(spt_list, fields)
+
+    common.print_formatted(
+        spt_list,
+        fields,
+        field_labels=field_labels,
+        output_format=args.output_format,
+        sortby_index=fields.index('name') if 'name' in fields else None
     )
 
 
@@ -317,32 +507,22 @@ def do_server_profile_template_list(args):
     '-t', '--server-profile-template',
     metavar='<spt>',
     help='Name or UUID of the HPE OneView Server Profile Template.')
+@common.arg(
+    '--format',
+    dest='output_format',
+    choices=common.OUTPUT_FORMATS,
+    default=common.TABLE_FORMAT,
+    help='Output format: table, json, ndjson or csv. Defaults to table.')
+@common.arg(
+    '--fields',
+    metavar='<field>[,<field>...]',
+    help='Comma separated fields to print: uuid, name, cpus, memory_mb, '
+         'local_gb, enclosure_group_name and server_hardware_type_name. '
+         'Defaults to all of them.')
 def do_server_hardware_list(args):
     """List Server Hardware of HPE OneView."""
-    facade_obj = facade.Facade(args)
-    node_creator = NodeCreator(facade_obj)
-
-    spt_list = facade_obj.list_templates_compatible()
-    node_creator.set_attributes_to_object(spt_list)
-
-    template_selected = {}
-    if args.server_profile_template:
-        template_selected = common.get_element(
-            spt_list, args.server_profile_template
-        )
-
-        if template_selected is None:
-            print(("Could not find a Server Profile Template matching '%s'")
-                  % args.server_profile_template)
-            return
-
-    s_hardware_list = node_creator.get_server_hardware_list(
-        template_selected
-    )
-    node_creator.set_attributes_to_object(s_hardware_list)
-
-    common.print_prompt(
-        s_hardware_list,
+    fields, field_labels = common.select_fields(
+        args.fields,
         [
             'uuid',
             'name',
@@ -352,7 +532,7 @@ def do_server_hardware_list(args):
             'enclosure_group_name',
             'server_hardware_type_name'
         ],
-        field_labels=[
+        [
             'UUID',
             'Name',
             'CPUs',
@@ -360,22 +540,59 @@ def do_server_hardware_list(args):
             'Local GB',
             'Enclosure Group Name',
             'Server Hardware Type Name'
-        ],
-        sortby_index=1
+        ]
+    )
+
+    facade_obj = facade.Facade(args)
+    _preload_reference_data(facade_obj, fields)
+    node_creator = NodeCreator(facade_obj, args.workers)
+
+    spt_list = common.IndexedList(facade_obj.list_templates_compatible())
+    node_creator.set_attributes_to_object(spt_list, ['uuid'])
+
+    template_selected = {}
+    if args.server_profile_template:
+        template_selected = common.get_element(
+            spt_list, args.server_profile_template
+        )
+
+        if template_selected is None:
+            print(("Could not find a Server Profile Template matching '%s'")
+                  % args.server_profile_template)
+            return
+
+    # NOTE: the Server Hardware is listed by name, one page at a time, and
+    # printed as it arrives.
+    s_hardware_list = node_creator.iter_with_attributes(
+        node_creator.iter_server_hardware(template_selected), fields)
+
+    common.print_formatted(
+        s_hardware_list,
+        fields,
+        field_labels=field_labels,
+        output_format=args.output_format
     )
 
 
-def _interactive_template(spt_list):
+def _preload_reference_data(facade_obj, fields):
+    if any(field in REFERENCE_FIELDS for field in fields):
+        facade_obj.preload_reference_data()
+
+
+def _interactive_template(node_creator, spt_list):
+    fields = [
+        'id',
+        'name',
+        'enclosure_group_name',
+        'server_hardware_type_name'
+    ]
+    node_creator.set_attributes_to_object(spt_list, fields)
+
     template_selected = None
     while not template_selected:
         input_id = common.print_prompt(
             spt_list,
-            [
-                'id',
-                'name',
-                'enclosure_group_name',
-                'server_hardware_type_name'
-            ],
+            fields,
             "Enter the id of the Server Profile Template you want to "
             "use (Press 'q' to quit)> ",
             [
@@ -425,16 +642,19 @@ def _create_nodes(node_creator, not_enrolled_server_hardware, args,
                   template_selected):
     if not_enrolled_server_hardware:
         print('Creating nodes to represent the following Server Hardware.')
+        fields = [
+            'name',
+            'cpus',
+            'memory_mb',
+            'local_gb',
+            'enclosure_group_name',
+            'server_hardware_type_name'
+        ]
+        node_creator.set_attributes_to_object(
+            not_enrolled_server_hardware, fields)
         common.print_prompt(
             not_enrolled_server_hardware,
-            [
-                'name',
-                'cpus',
-                'memory_mb',
-                'local_gb',
-                'enclosure_group_name',
-                'server_hardware_type_name'
-            ],
+            fields,
             field_labels=[
                 'Name',
                 'CPUs',
@@ -444,38 +664,32 @@ def _create_nodes(node_creator, not_enrolled_server_hardware, args,
                 'Server Hardware Type Name'
             ]
         )
-        for server_hardware in not_enrolled_server_hardware:
-            if node_creator.is_server_profile_applied(
-                    server_hardware):
-                print('The Server Hardware %s is in use by OneView.' %
-                      server_hardware.get('name'))
-
-            node = node_creator.create_node(
-                args, server_hardware, template_selected
-            )
+        node_creator.create_nodes(
+            args, not_enrolled_server_hardware, template_selected)
 
-            print('Node ' + node.uuid + ' was created!')
 
-
-def _interactive_server_hardware(s_hardware_list):
+def _interactive_server_hardware(node_creator, s_hardware_list):
     print('Listing compatible Server Hardware objects...')
 
+    fields = [
+        'id',
+        'name',
+        'cpus',
+        'memory_mb',
+        'local_gb',
+        'cpu_arch',
+        'enclosure_group_name',
+        'server_hardware_type_name',
+        'enrolled'
+    ]
+    node_creator.set_attributes_to_object(s_hardware_list, fields)
+
     s_hardware_ids_selected = []
     invalid_server_hardware = True
     while invalid_server_hardware:
         input_id = common.print_prompt(
             s_hardware_list,
-            [
-                'id',
-                'name',
-                'cpus',
-                'memory_mb',
-                'local_gb',
-                'cpu_arch',
-                'enclosure_group_name',
-                'server_hardware_type_name',
-                'enrolled'
-            ],
+            fields,
             "Enter a space separated list of Server Hardware "
             "ids you want to use, e.g. 1 2 3 4. ('q' to quit)> ",
             field_labels=[
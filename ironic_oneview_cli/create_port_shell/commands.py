@@ -14,26 +14,46 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from ironic_oneview_cli import common
 from ironic_oneview_cli import exceptions
 from ironic_oneview_cli import facade
 
 
 class PortCreator(object):
-    def __init__(self, port_facade):
+    def __init__(self, port_facade, index_ports=False):
         self.facade = port_facade
+        self.index_ports = index_ports
+        self._port_index = None
+        self._port_index_lock = threading.Lock()
 
     def create_port(self, args, ironic_node):
         server_hardware_uri = ironic_node.driver_info.get(
             "server_hardware_uri")
         server_hardware = self.facade.get_server_hardware(server_hardware_uri)
-
-        if args.mac:
-            mac = args.mac
+        return self.create_port_for_server_hardware(
+            ironic_node, server_hardware, args.mac)
+
+    def create_port_for_server_hardware(self, ironic_node, server_hardware,
+                                        mac=None):
+        """Create the port of a node whose Server Hardware is known.
+
+        :param ironic_node: the Ironic node.
+        :param server_hardware: the Server Hardware dict of the node.
+        :param mac: the MAC address of the port; it is validated against the
+            Server Hardware. If not given, it is taken from the Server
+            Hardware.
+        :returns: the created Ironic port, or None if the MAC is not valid.
+        """
+        if mac:
+            is_valid_mac = self.validate_server_hardware_mac(
+                mac, server_hardware)
         else:
             mac = self.get_server_hardware_mac(server_hardware)
+            is_valid_mac = bool(mac)
 
-        if not self.validate_server_hardware_mac(mac, server_hardware):
+        if not is_valid_mac:
             print(("WARNING: mac %(mac)s doesn't match any server "
                    "hardware's %(sh)s ports.\n"
                    "Use ironic-oneview port-create command with a valid MAC "
@@ -44,7 +64,11 @@ class PortCreator(object):
         self.verifify_existing_ports_for_node(ironic_node)
 
         attrs = common.create_attrs_for_port(ironic_node, mac)
-        return self.facade.create_ironic_port(**attrs)
+        port = self.facade.create_ironic_port(**attrs)
+        with self._port_index_lock:
+            if self._port_index is not None:
+                self._port_index.setdefault(ironic_node.uuid, []).append(port)
+        return port
 
     def validate_server_hardware_mac(self, mac, server_hardware):
         """Validate if MAC exists for Server Hardware.
@@ -93,10 +117,34 @@ class PortCreator(object):
             "There is no Ethernet port on the Server Hardware: %s"
             % server_hardware.get('uri'))
 
+    def get_port_index(self):
+        """Map each Ironic node UUID to its ports.
+
+        The index is built from a single Ironic port listing the first time
+        it is needed and kept up to date by create_port afterwards.
+
+        :returns: a dict of node_uuid -> list of Ironic ports.
+        """
+        with self._port_index_lock:
+            if self._port_index is None:
+                port_index = {}
+                for port in self.facade.iter_ironic_ports():
+                    port_index.setdefault(port.node_uuid, []).append(port)
+                self._port_index = port_index
+        return self._port_index
+
+    def get_node_ports(self, ironic_node):
+        """Get the Ironic ports of a node.
+
+        Creating ports for many nodes reads them from the port index,
+        otherwise only the ports of the node are listed by Ironic.
+        """
+        if self.index_ports:
+            return list(self.get_port_index().get(ironic_node.uuid, ()))
+        return self.facade.get_ironic_port_list(node_uuid=ironic_node.uuid)
+
     def verifify_existing_ports_for_node(self, ironic_node):
-        ironic_ports = self.facade.get_ironic_port_list()
-        ports = [port for port in ironic_ports if
-                 port.node_uuid == ironic_node.uuid]
+        ports = self.get_node_ports(ironic_node)
         if ports:
             print("There are created ports for this node already. The CLI "
                   "will try to create it as another port.")
@@ -121,7 +169,10 @@ def do_port_create(args):
     port_creator = PortCreator(facade_obj)
 
     ironic_node = facade_obj.get_ironic_node(args.node)
-    port = port_creator.create_port(args, ironic_node)
+    try:
+        port = port_creator.create_port(args, ironic_node)
+    finally:
+        facade_obj.logout_ilo_sessions()
 
     if port:
         print("Created port %s" % port.uuid)
@@ -0,0 +1,88 @@
+# Copyright (2015-2017) Hewlett Packard Enterprise Development LP
+# Copyright (2015-2017) Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import os
+import threading
+
+from ironic_oneview_cli import cache
+
+KEYSTONE = 'keystone'
+ONEVIEW = 'oneview'
+
+
+def get_default_path():
+    return os.path.join(cache.get_cache_dir(), 'credentials.json')
+
+
+def get_cache_key(*fields):
+    """Build the key of a cache entry from the fields identifying a login.
+
+    Passwords are not part of the key, so they are never written to disk.
+    """
+    identity = '\n'.join('' if field is None else str(field)
+                         for field in fields)
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+class CredentialCache(object):
+    """On-disk cache of Keystone tokens and OneView session IDs.
+
+    The file is only readable by its owner. Values are registered with
+    ``track`` and read again by ``save``, so tokens renewed while a command
+    runs are the ones persisted.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or get_default_path())
+        self._data = {}
+        self._tracked = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        data = cache.read_json(self.path)
+        self._data = data if isinstance(data, dict) else {}
+
+    def get(self, section, key):
+        with self._lock:
+            return self._data.get(section, {}).get(key)
+
+    def set(self, section, key, value):
+        with self._lock:
+            self._data.setdefault(section, {})[key] = value
+
+    def invalidate(self, section, key):
+        with self._lock:
+            self._data.get(section, {}).pop(key, None)
+            self._tracked.pop((section, key), None)
+
+    def track(self, section, key, getter):
+        """Store the value returned by getter when the cache is saved."""
+        with self._lock:
+            self._tracked[(section, key)] = getter
+
+    def save(self):
+        for (section, key), getter in list(self._tracked.items()):
+            try:
+                value = getter()
+            except Exception:
+                continue
+            if value:
+                self.set(section, key, value)
+
+        with self._lock:
+            cache.write_json(self.path, self._data)
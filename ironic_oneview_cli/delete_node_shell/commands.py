@@ -14,33 +14,107 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+
 from ironic_oneview_cli import common
+from ironic_oneview_cli import exceptions
 from ironic_oneview_cli import facade
 
+# NOTE: Ironic refuses to delete nodes in any other provision state, unless
+# they are in maintenance mode.
+DELETE_ALLOWED_STATES = ('available', 'manageable', 'enroll', 'adopt failed')
+DELETE_BATCH_SIZE = 100
+DELETE_NODE_FIELDS = ['uuid', 'provision_state', 'maintenance',
+                      'instance_uuid']
+MAINTENANCE_REASON = 'Set by ironic-oneview node-delete'
+
 
 class NodeDelete(object):
 
-    def __init__(self, delete_facade):
+    def __init__(self, delete_facade, workers=common.DEFAULT_WORKERS,
+                 maintenance=False, batch_size=DELETE_BATCH_SIZE):
         self.facade = delete_facade
+        self.workers = workers
+        self.maintenance = maintenance
+        self.batch_size = batch_size
 
     def manage_delete(self, number=None):
-        nodes = self.facade.get_ironic_node_list()
-        try:
-            if number:
-                self.delete_n_nodes(nodes, number)
-            else:
-                for node in nodes:
-                    self.facade.node_delete(node.uuid)
-        except Exception:
-            raise
+        nodes = self.facade.iter_ironic_nodes(fields=DELETE_NODE_FIELDS)
+        if number:
+            return self.delete_n_nodes(nodes, number)
+        return self.delete_nodes(nodes)
 
     def delete_n_nodes(self, nodes, number):
-        upper_limit = min(number, len(nodes))
-        try:
-            for n in range(upper_limit):
-                self.facade.node_delete(nodes[n].uuid)
-        except Exception:
-            raise
+        return self.delete_nodes(itertools.islice(nodes, number))
+
+    def delete_nodes(self, nodes):
+        """Delete Ironic nodes concurrently, in batches.
+
+        When maintenance is enabled, the nodes of each batch in a provision
+        state Ironic refuses to delete are put in maintenance mode first,
+        except the ones with an instance, which are reported as failures.
+        A failure does not stop the deletion of the other nodes.
+
+        :param nodes: iterable of Ironic nodes.
+        :returns: a tuple with the number of deleted nodes and a list of
+                  (node, error) tuples for the nodes that failed.
+        """
+        deleted = 0
+        failures = []
+        nodes = iter(nodes)
+        while True:
+            batch = list(itertools.islice(nodes, self.batch_size))
+            if not batch:
+                break
+
+            if self.maintenance:
+                batch = self._set_maintenance(batch, failures)
+
+            for node, _, error in common.iter_parallel(
+                    self._delete_node, batch, self.workers):
+                if error is not None:
+                    failures.append((node, error))
+                else:
+                    deleted += 1
+        if deleted:
+            # NOTE: the cached Server Hardware listings are dropped once for
+            # the whole deletion.
+            self.facade.invalidate_inventory('server-hardware')
+        return deleted, failures
+
+    def _delete_node(self, node):
+        return self.facade.node_delete(node.uuid)
+
+    def _set_maintenance(self, nodes, failures):
+        def _needs_maintenance(node):
+            return (not node.maintenance and
+                    node.provision_state not in DELETE_ALLOWED_STATES)
+
+        def _set_node_maintenance(node):
+            return self.facade.node_set_maintenance(
+                node.uuid, True, MAINTENANCE_REASON)
+
+        deletable = []
+        to_maintenance = []
+        for node in nodes:
+            if not _needs_maintenance(node):
+                deletable.append(node)
+            elif node.instance_uuid:
+                # NOTE: Ironic refuses to delete a node with an instance even
+                # in maintenance mode, so its maintenance flag is left alone.
+                failures.append((node, exceptions.NodeInUseError(
+                    "Node %(node)s has the instance %(instance)s" %
+                    {'node': node.uuid, 'instance': node.instance_uuid})))
+            else:
+                to_maintenance.append(node)
+
+        for node, _, error in common.iter_parallel(
+                _set_node_maintenance, to_maintenance, self.workers):
+            if error is not None:
+                failures.append((node, error))
+            else:
+                deletable.append(node)
+        return deletable
 
 
 @common.arg(
@@ -53,18 +127,32 @@ class NodeDelete(object):
     type=int,
     help='Delete multiple ironic nodes'
 )
+@common.arg(
+    '--maintenance',
+    action='store_true',
+    default=False,
+    help='Put nodes in a provision state Ironic refuses to delete in '
+         'maintenance mode before deleting them'
+)
 def do_node_delete(args):
     """Delete nodes in Ironic."""
-    node_delete = NodeDelete(facade.Facade(args))
+    node_delete = NodeDelete(facade.Facade(args), args.workers,
+                             args.maintenance)
 
     if args.all:
         message = '\nDo you really want to delete all nodes? [y/N] '
         response = common.approve_command_prompt(message)
         if response:
-            node_delete.manage_delete()
-            print('\nNodes deleted!')
+            _print_delete_summary(*node_delete.manage_delete())
     elif args.number:
-        node_delete.manage_delete(args.number)
-        print('\nNodes deleted!')
+        _print_delete_summary(*node_delete.manage_delete(args.number))
     else:
         print('\nNot implemented')
+
+
+def _print_delete_summary(deleted, failures):
+    for node, error in failures:
+        print('Failed to delete node %(node)s: %(error)s' %
+              {'node': node.uuid, 'error': error})
+    print('\n%(deleted)s node(s) deleted, %(failed)s failure(s).' %
+          {'deleted': deleted, 'failed': len(failures)})
@@ -43,3 +43,21 @@ class OneViewResourceNotFoundError(Exception):
 
     def __str__(self):
         return repr(self.message)
+
+
+class OperationTimeoutError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super(OperationTimeoutError, self).__init__(message)
+
+    def __str__(self):
+        return repr(self.message)
+
+
+class NodeInUseError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super(NodeInUseError, self).__init__(message)
+
+    def __str__(self):
+        return repr(self.message)
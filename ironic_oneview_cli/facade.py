@@ -14,32 +14,164 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
 import json
-import redfish
+import os
+import threading
 
+from six.moves.urllib import parse
+
+from ironic_oneview_cli import cache
 from ironic_oneview_cli import common
+from ironic_oneview_cli import credential_cache
+from ironic_oneview_cli import exceptions
+
+redfish = common.LazyModule('redfish')
 
 ILOREST_BASE_PORT = 443
 
+# NOTE: the node fields the commands use; requesting only these keeps the
+# Ironic node listings small.
+ONEVIEW_NODE_FIELDS = ['uuid', 'name', 'driver', 'driver_info', 'properties',
+                       'provision_state']
+ILO_TIMEOUT = 60
+
+# NOTE: number of nodes or ports requested per Ironic listing page.
+IRONIC_PAGE_SIZE = 100
+
+# NOTE: OneView collections are listed in pages of ONEVIEW_PAGE_SIZE members,
+# sorted by name so the pages do not overlap.
+ONEVIEW_PAGE_SIZE = 100
+ONEVIEW_SORT = 'name:ascending'
+
+# NOTE: the attributes used to list Server Hardware and templates and to
+# match them; heavy sections such as the port map are only requested for
+# the Server Hardware being enrolled.
+SERVER_HARDWARE_FIELDS = ['uri', 'name', 'serverHardwareTypeUri',
+                          'serverGroupUri', 'processorCount',
+                          'processorCoreCount', 'memoryMb',
+                          'serverProfileUri']
+SERVER_PROFILE_TEMPLATE_FIELDS = ['uri', 'name', 'serverHardwareTypeUri',
+                                  'enclosureGroupUri']
+
+# NOTE: seconds during which a cached OneView collection is trusted without
+# asking OneView whether it changed.
+INVENTORY_TTLS = {
+    'server-hardware': 60,
+    'server-profile-templates': 300,
+    'server-hardware-types': 3600,
+    'enclosure-groups': 3600
+}
+
+# NOTE: the hpOneView client attribute of each listed OneView collection.
+ONEVIEW_COLLECTIONS = {
+    'server-hardware': 'server_hardware',
+    'server-profile-templates': 'server_profile_templates',
+    'server-hardware-types': 'server_hardware_types',
+    'enclosure-groups': 'enclosure_groups'
+}
+
 
 class Facade(object):
 
     def __init__(self, args):
-        self.ironicclient = common.get_ironic_client(args)
-        self.novaclient = common.get_nova_client(args)
-        self.hponeview_client = common.get_hponeview_client(args)
+        self.args = args
+        self.resource_cache = cache.ResourceCache(
+            is_negative=common.is_oneview_resource_not_found)
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._ilo_sessions = {}
+        self._ilo_hosts = {}
+        self._ilo_macs = {}
+        self._ilo_lock = threading.Lock()
+
+        self.inventory_cache = None
+        if not getattr(args, 'no_cache', True):
+            self.inventory_cache = cache.InventoryCache(
+                os.path.join(
+                    cache.get_cache_dir(), 'inventory',
+                    credential_cache.get_cache_key(
+                        args.ov_auth_url, args.ov_username)),
+                refresh=args.refresh)
+
+    # NOTE: clients are only created, and authenticated, on first use, so a
+    # command only pays for the services it actually talks to.
+    @property
+    def ironicclient(self):
+        return self._get_client('ironic', common.get_ironic_client)
+
+    @property
+    def novaclient(self):
+        return self._get_client('nova', common.get_nova_client)
+
+    @property
+    def hponeview_client(self):
+        return self._get_client('oneview', common.get_hponeview_client)
+
+    def _get_client(self, name, factory):
+        client = self._clients.get(name)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = factory(self.args)
+                    self._clients[name] = client
+        return client
 
     # =========================================================================
     # Ironic actions
     # =========================================================================
-    def get_ironic_node_list(self):
-        return self.ironicclient.node.list(detail=True)
+    def iter_ironic_nodes(self, fields=None, **filters):
+        """Iterate over the Ironic nodes, listed one page at a time.
+
+        :param fields: the node fields to return, or None for all of them.
+        :param filters: node.list filters, e.g. driver.
+        :returns: an iterator over Ironic nodes.
+        """
+        if fields:
+            filters['fields'] = fields
+        else:
+            filters['detail'] = True
+        return common.iter_paginated(
+            lambda marker, limit: self.ironicclient.node.list(
+                marker=marker, limit=limit, **filters),
+            lambda node: node.uuid, IRONIC_PAGE_SIZE)
+
+    def iter_oneview_nodes(self, fields=ONEVIEW_NODE_FIELDS):
+        """Iterate over the Ironic nodes using a OneView driver or type.
+
+        Ironic filters the nodes of each driver, and only the given fields
+        are returned. The first page of every driver is requested at once.
+
+        :param fields: the node fields to return.
+        :returns: a generator of Ironic nodes.
+        """
+        drivers = common.SUPPORTED_DRIVERS + common.SUPPORTED_HARDWARE_TYPES
+        node_iterators = [self.iter_ironic_nodes(fields, driver=driver)
+                          for driver in drivers]
+
+        node_uuids = set()
+        for node in itertools.chain.from_iterable(node_iterators):
+            if node.uuid not in node_uuids:
+                node_uuids.add(node.uuid)
+                yield node
 
     def get_ironic_node(self, node_uuid):
         return self.ironicclient.node.get(node_uuid)
 
-    def get_ironic_port_list(self):
-        return self.ironicclient.port.list(detail=True)
+    def iter_ironic_ports(self, node_uuid=None):
+        """Iterate over the Ironic ports, listed one page at a time.
+
+        :param node_uuid: only return the ports of this node.
+        :returns: an iterator over Ironic ports.
+        """
+        return common.iter_paginated(
+            lambda marker, limit: self.ironicclient.port.list(
+                node=node_uuid, detail=True, marker=marker, limit=limit),
+            lambda port: port.uuid, IRONIC_PAGE_SIZE)
+
+    def get_ironic_port_list(self, node_uuid=None):
+        return list(self.iter_ironic_ports(node_uuid))
 
     def node_set_maintenance(self, node_uuid, maintenance_mode, maint_reason):
         return self.ironicclient.node.set_maintenance(
@@ -88,57 +220,334 @@ class Facade(object):
     def get_server_profile_template(self, uri):
         if not uri:
             return None
-        uuid = common.get_uuid_from_uri(uri)
-        return self.hponeview_client.server_profile_templates.get(uuid)
+        return self._get_cached_resource(
+            self.hponeview_client.server_profile_templates, uri)
 
     def get_enclosure_group(self, uri):
         if not uri:
             return None
-        uuid = common.get_uuid_from_uri(uri)
-        return self.hponeview_client.enclosure_groups.get(uuid)
+        return self._get_cached_resource(
+            self.hponeview_client.enclosure_groups, uri)
 
     def get_server_hardware_type(self, uri):
-        uuid = common.get_uuid_from_uri(uri)
-        return self.hponeview_client.server_hardware_types.get(uuid)
+        return self._get_cached_resource(
+            self.hponeview_client.server_hardware_types, uri)
 
     def get_server_profile(self, uri):
         uuid = common.get_uuid_from_uri(uri)
         return self.hponeview_client.server_profiles.get(uuid)
 
+    def preload_reference_data(self):
+        """Load all Enclosure Groups and Server Hardware Types at once.
+
+        Both collections are small and shared by every Server Hardware, so
+        one listing of each replaces a GET per object being enriched. Later
+        lookups through get_enclosure_group and get_server_hardware_type are
+        then served from the resource cache.
+        """
+        for collection in ('enclosure-groups', 'server-hardware-types'):
+            for resource in self._list_collection(collection):
+                self.resource_cache.set(resource.get('uri'), resource)
+
+    def _list_collection(self, collection, filters='', fields=None):
+        """List a OneView collection, through the inventory cache if enabled.
+
+        :param collection: the collection name, one of ONEVIEW_COLLECTIONS.
+        :param filters: a OneView filter or list of filters.
+        :param fields: the attributes to return, or None for all of them.
+        :returns: the list of resources.
+        """
+        return list(self._iter_collection(collection, filters, fields))
+
+    def _iter_collection(self, collection, filters='', fields=None):
+        """Iterate over a OneView collection sorted by name.
+
+        The collection is listed one page at a time, or read from the
+        inventory cache if enabled, so it is never held in memory as a
+        whole. The OneView client is only used when OneView is queried, so a
+        listing served from the cache does not log in to OneView.
+
+        :param collection: the collection name, one of ONEVIEW_COLLECTIONS.
+        :param filters: a OneView filter or list of filters.
+        :param fields: the attributes to return, or None for all of them.
+        :returns: an iterator over the resources.
+        """
+        def _list_page(start, count):
+            resource_client = self._get_resource_client(collection)
+            if fields:
+                return self._get_collection_page(
+                    resource_client, start, count, filters, fields)
+            return resource_client.get_all(
+                start=start, count=count, filter=filters, sort=ONEVIEW_SORT)
+
+        def _iter_pages():
+            return common.iter_offset_paginated(_list_page, ONEVIEW_PAGE_SIZE)
+
+        if self.inventory_cache is None:
+            return _iter_pages()
+
+        return self.inventory_cache.iter(
+            collection,
+            credential_cache.get_cache_key(json.dumps([filters, fields])),
+            _iter_pages,
+            lambda: self._get_collection_version(
+                self._get_resource_client(collection), filters),
+            INVENTORY_TTLS.get(collection, cache.DEFAULT_TTL))
+
+    def _get_resource_client(self, collection):
+        return getattr(self.hponeview_client, ONEVIEW_COLLECTIONS[collection])
+
+    def _get_collection_page(self, resource_client, start, count, filters,
+                             fields):
+        """Get a page of a OneView collection with only the given fields.
+
+        OneView may return fewer members than requested even though more
+        remain, so the rest of the page is requested until it is full or
+        there is no next page, like hpOneView does for get_all. A page is
+        then only shorter than count at the end of the collection.
+        """
+        members = []
+        while len(members) < count:
+            body = self.hponeview_client.connection.get(self._get_query_uri(
+                resource_client, start + len(members), count - len(members),
+                filters, ONEVIEW_SORT, fields))
+            page = body.get('members') or []
+            members.extend(page)
+            if not page or body.get('nextPageUri') is None:
+                break
+        return members
+
+    def _get_collection_version(self, resource_client, filters):
+        """Get a value that changes whenever a OneView collection changes.
+
+        Only the most recently modified member is requested: the total
+        changes when members are added or removed, and the eTag and
+        modification date of the newest member change on any update.
+        """
+        body = self.hponeview_client.connection.get(self._get_query_uri(
+            resource_client, 0, 1, filters, 'modified:descending'))
+        newest = (body.get('members') or [{}])[0]
+        return [body.get('total'), body.get('eTag'),
+                newest.get('eTag'), newest.get('modified')]
+
+    @staticmethod
+    def _get_query_uri(resource_client, start, count, filters, sort,
+                       fields=None):
+        if not isinstance(filters, list):
+            filters = [filters] if filters else []
+        query = ['start=%s' % start, 'count=%s' % count, 'sort=%s' % sort]
+        query.extend('filter=%s' % parse.quote(f) for f in filters)
+        if fields:
+            query.append('fields=%s' % ','.join(fields))
+        return '%s?%s' % (resource_client.URI, '&'.join(query))
+
+    def invalidate_inventory(self, collection=None):
+        """Drop cached OneView collections after they may have changed."""
+        if self.inventory_cache is not None:
+            self.inventory_cache.invalidate(collection)
+
+    def _get_cached_resource(self, resource_client, uri):
+        """Get a OneView resource by URI, reusing previous lookups.
+
+        :param resource_client: the hpOneView client of the resource type.
+        :param uri: the resource URI, which is also the cache key.
+        :returns: the resource dict.
+        """
+        def _load(resource_uri):
+            return resource_client.get(
+                common.get_uuid_from_uri(resource_uri))
+        return self.resource_cache.get(uri, _load)
+
     def list_templates_compatible(self, server_hardware_list=None):
-        spt_list = self.hponeview_client.server_profile_templates.get_all()
+        if server_hardware_list and len(server_hardware_list) == 1:
+            spt_list = self.list_templates_for_server_hardware(
+                server_hardware_list[0])
+        else:
+            spt_list = self.list_all_templates()
         if not server_hardware_list:
-            server_hardware_list = self.filter_server_hardware_available()
+            server_hardware_list = self.iter_server_hardware()
         return common.get_server_profile_compatible(spt_list,
                                                     server_hardware_list)
 
     def list_all_templates(self):
-        return self.hponeview_client.server_profile_templates.get_all()
+        return self._list_collection(
+            'server-profile-templates', fields=SERVER_PROFILE_TEMPLATE_FIELDS)
+
+    def list_templates_for_server_hardware(self, server_hardware):
+        """List the templates of the type and group of a Server Hardware.
+
+        OneView filters the templates, so only the matching ones are
+        downloaded. Rack servers are in no enclosure group, so their
+        templates are only filtered by Server Hardware Type.
+        """
+        filters = ["serverHardwareTypeUri='%s'" %
+                   server_hardware.get('serverHardwareTypeUri')]
+        if server_hardware.get('serverGroupUri'):
+            filters.append("enclosureGroupUri='%s'" %
+                           server_hardware.get('serverGroupUri'))
+        return self._list_collection(
+            'server-profile-templates', filters,
+            SERVER_PROFILE_TEMPLATE_FIELDS)
+
+    def find_server_profile_template(self, uuid_name_uri):
+        """Find a Server Profile Template by UUID, name or URI.
+
+        A URI is fetched directly, and a name is looked up with a filtered
+        query, falling back to fetching it as a UUID. OneView filters cannot
+        quote a name containing a quote, so such names are matched against
+        the listed templates instead.
+
+        :returns: the template dict, or None if there is no such template.
+        """
+        spt_client = self.hponeview_client.server_profile_templates
+        if not uuid_name_uri.startswith('/rest/'):
+            if "'" in uuid_name_uri:
+                templates = self._iter_collection(
+                    'server-profile-templates',
+                    fields=SERVER_PROFILE_TEMPLATE_FIELDS)
+            else:
+                templates = self._get_collection_page(
+                    spt_client, 0, 1, "name='%s'" % uuid_name_uri,
+                    SERVER_PROFILE_TEMPLATE_FIELDS)
+            for template in templates:
+                if template.get('name') == uuid_name_uri:
+                    return template
+            uuid_name_uri = '%s/%s' % (spt_client.URI, uuid_name_uri)
+
+        try:
+            return self.get_server_profile_template(uuid_name_uri)
+        except Exception as ex:
+            if common.is_oneview_resource_not_found(ex):
+                return None
+            raise
 
-    def filter_server_hardware_available(self, filters=''):
-        return self.hponeview_client.server_hardware.get_all(filter=filters)
+    def iter_server_hardware(self, filters='', fields=SERVER_HARDWARE_FIELDS):
+        """Iterate over the Server Hardware, by name.
+
+        :param filters: a OneView filter or list of filters.
+        :param fields: the attributes to return, or None for all of them.
+        :returns: an iterator over Server Hardware dicts.
+        """
+        return self._iter_collection('server-hardware', filters, fields)
+
+    def load_server_hardware_port_maps(self, server_hardware_list,
+                                       workers=common.DEFAULT_WORKERS):
+        """Fetch the port map of Server Hardware listed without it.
+
+        Server Hardware without a port map, such as rack servers, get None.
+        Server Hardware that could not be fetched are left without the
+        portMap key, so a later call fetches them again.
+
+        :param server_hardware_list: list of server hardware dicts, updated
+            in place.
+        :param workers: maximum number of Server Hardware fetched at once.
+        :returns: a dict of server hardware uri -> error for the server
+                  hardware that could not be fetched.
+        """
+        projected = [server_hardware
+                     for server_hardware in server_hardware_list
+                     if 'portMap' not in server_hardware]
+        errors = {}
+        for server_hardware, full, error in common.iter_parallel(
+                lambda server_hardware: self.get_server_hardware(
+                    server_hardware.get('uri')),
+                projected, workers):
+            if error is None and full is None:
+                error = exceptions.OneViewResourceNotFoundError(
+                    "Server Hardware not found: %s"
+                    % server_hardware.get('uri'))
+            if error is not None:
+                errors[server_hardware.get('uri')] = error
+                continue
+            server_hardware['portMap'] = full.get('portMap')
+        return errors
 
     def get_ilorest_client(self, server_hardware):
-        """Generate an instance of the iLORest library client.
+        """Get an iLORest library client for the iLO of a Server Hardware.
+
+        Clients are pooled by iLO host until logout_ilo_sessions is called.
 
         :param: server_hardware: a dict representing the server hardware
         :returns: an instance of the iLORest client
         """
+        uri = server_hardware.get('uri')
+        with self._ilo_lock:
+            client = self._ilo_sessions.get(self._ilo_hosts.get(uri))
+        if client is not None:
+            return client
+
         remote_console = (
-            self.hponeview_client.server_hardware.get_remote_console_url(
-                server_hardware.get('uri')))
+            self.hponeview_client.server_hardware.get_remote_console_url(uri))
         host_ip, ilo_token = common.get_ilo_access(remote_console)
         base_url = "https://%s:%s" % (host_ip, ILOREST_BASE_PORT)
-        return redfish.rest_client(base_url=base_url, sessionkey=ilo_token)
+        client = redfish.rest_client(base_url=base_url, sessionkey=ilo_token)
+        with self._ilo_lock:
+            self._ilo_hosts[uri] = host_ip
+            pooled_client = self._ilo_sessions.setdefault(host_ip, client)
+        if pooled_client is not client:
+            self._logout_ilo_session(client)
+        return pooled_client
+
+    def logout_ilo_sessions(self):
+        """Log out of every pooled iLO session."""
+        with self._ilo_lock:
+            clients = list(self._ilo_sessions.values())
+            self._ilo_sessions.clear()
+        for client in clients:
+            self._logout_ilo_session(client)
+
+    @staticmethod
+    def _logout_ilo_session(client):
+        try:
+            client.logout()
+        except Exception:
+            # NOTE: the session expires on the iLO anyway.
+            pass
 
     def get_server_hardware_mac_from_ilo(self, server_hardware):
         """Get the MAC address from a server hardware using iLO
 
+        The outcome is remembered, so each iLO is only queried once, and
+        the query is abandoned after ILO_TIMEOUT seconds.
+
         :param: server_hardware: a server hardware uuid or uri
         :return: the MAC address
         """
-        client = self.get_ilorest_client(server_hardware)
-        hardware = json.loads(client.get("/rest/v1/systems/1").text)
-        hardware_mac = hardware['HostCorrelation']['HostMACAddress'][0]
+        uri = server_hardware.get('uri')
+        with self._ilo_lock:
+            outcome = self._ilo_macs.get(uri)
+        if outcome is None:
+            try:
+                outcome = (common.call_with_timeout(
+                    ILO_TIMEOUT, self._read_ilo_mac, server_hardware), None)
+            except Exception as ex:
+                outcome = (None, ex)
+            with self._ilo_lock:
+                self._ilo_macs[uri] = outcome
 
+        hardware_mac, error = outcome
+        if error is not None:
+            raise error
         return hardware_mac
+
+    def get_server_hardware_macs_from_ilo(self, server_hardware_list,
+                                          workers=common.DEFAULT_WORKERS):
+        """Get the MAC addresses of many server hardware using iLO.
+
+        :param server_hardware_list: list of server hardware dicts.
+        :param workers: maximum number of iLOs queried at once.
+        :returns: a dict of server hardware uri -> MAC address, without the
+                  server hardware whose iLO could not be queried.
+        """
+        hardware_macs = {}
+        for server_hardware, hardware_mac, error in common.iter_parallel(
+                self.get_server_hardware_mac_from_ilo, server_hardware_list,
+                workers):
+            if error is None:
+                hardware_macs[server_hardware.get('uri')] = hardware_mac
+        return hardware_macs
+
+    def _read_ilo_mac(self, server_hardware):
+        client = self.get_ilorest_client(server_hardware)
+        hardware = json.loads(client.get("/rest/v1/systems/1").text)
+        return hardware['HostCorrelation']['HostMACAddress'][0]
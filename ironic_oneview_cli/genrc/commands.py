@@ -42,6 +42,15 @@ def do_genrc():
     print("\n# Path to OneView CA certificate file.")
     print("#export OV_CACERT=")
 
+    print("\n# Maximum number of concurrent requests to OpenStack "
+          "and OneView.")
+    print("#export IRONIC_ONEVIEW_WORKERS=10")
+
+    print("\n# Reuse Keystone tokens and OneView sessions between runs.")
+    print("#export IRONIC_ONEVIEW_CACHE_CREDENTIALS=False")
+    print("#export IRONIC_ONEVIEW_CREDENTIAL_CACHE_FILE="
+          "~/.cache/ironic-oneview-cli/credentials.json")
+
     # OpenStack
 
     print("\n# Assume inspection is used for OneView nodes in Ironic.\n"
@@ -18,35 +18,36 @@
 
 from __future__ import print_function
 import argparse
+import collections
+import copy
 import getpass
 import six
 import sys
 
 from oslo_utils import encodeutils
+from oslo_utils import importutils
 
 import ironic_oneview_cli
 from ironic_oneview_cli import common
-from ironic_oneview_cli.create_flavor_shell import (
-    commands as flavor_create_commands)
-from ironic_oneview_cli.create_node_shell import (
-    commands as node_create_commands)
-from ironic_oneview_cli.create_port_shell import (
-    commands as port_create_commands)
-from ironic_oneview_cli.delete_node_shell import (
-    commands as node_delete_commands)
+from ironic_oneview_cli import credential_cache
 from ironic_oneview_cli import exceptions
 from ironic_oneview_cli.genrc import commands as genrc_commands
 from ironic_oneview_cli import service_logging as logging
 
 VERSION = '2.0.0'
 
-COMMAND_MODULES = [
-    node_create_commands,
-    flavor_create_commands,
-    port_create_commands,
-    node_delete_commands,
-    genrc_commands
-]
+# NOTE: command modules are imported only when one of their commands is
+# run, or when the full help is requested.
+COMMAND_MODULES = collections.OrderedDict([
+    ('node-create', 'ironic_oneview_cli.create_node_shell.commands'),
+    ('server-profile-template-list',
+     'ironic_oneview_cli.create_node_shell.commands'),
+    ('server-hardware-list', 'ironic_oneview_cli.create_node_shell.commands'),
+    ('flavor-create', 'ironic_oneview_cli.create_flavor_shell.commands'),
+    ('port-create', 'ironic_oneview_cli.create_port_shell.commands'),
+    ('node-delete', 'ironic_oneview_cli.delete_node_shell.commands'),
+    ('genrc', 'ironic_oneview_cli.genrc.commands')
+])
 
 
 class IronicOneView(object):
@@ -75,8 +76,50 @@ class IronicOneView(object):
                             "against any certificate authorities. This "
                             "option should be used with caution.")
 
-        inspection_enabled = common.env(
-            'OS_INSPECTION_ENABLED', default='False').lower() == 'true'
+        parser.add_argument('--workers',
+                            type=int,
+                            default=common.env(
+                                'IRONIC_ONEVIEW_WORKERS',
+                                default=common.DEFAULT_WORKERS),
+                            help='Maximum number of concurrent requests to '
+                                 'OpenStack and OneView. Defaults to '
+                                 'env[IRONIC_ONEVIEW_WORKERS] or %s' %
+                                 common.DEFAULT_WORKERS)
+
+        cache_credentials = common.env(
+            'IRONIC_ONEVIEW_CACHE_CREDENTIALS',
+            default='False').lower() == 'true'
+
+        parser.add_argument('--cache-credentials',
+                            default=cache_credentials,
+                            action="store_true",
+                            help="Reuse Keystone tokens and OneView sessions "
+                                 "between runs, storing them in a file only "
+                                 "readable by the current user. Defaults to "
+                                 "env[IRONIC_ONEVIEW_CACHE_CREDENTIALS]")
+
+        parser.add_argument('--credential-cache-file',
+                            default=common.env(
+                                'IRONIC_ONEVIEW_CREDENTIAL_CACHE_FILE'),
+                            help='Path to the credential cache file. '
+                                 'Defaults to '
+                                 'env[IRONIC_ONEVIEW_CREDENTIAL_CACHE_FILE] '
+                                 'or ~/.cache/ironic-oneview-cli/'
+                                 'credentials.json')
+
+        parser.add_argument('--no-cache',
+                            action="store_true",
+                            help="Do not use the on-disk cache of OneView "
+                                 "Server Hardware, Server Profile Templates, "
+                                 "Server Hardware Types and Enclosure Groups.")
+
+        parser.add_argument('--refresh',
+                            action="store_true",
+                            help="Download the cached OneView collections "
+                                 "again, replacing the on-disk cache.")
+
+        inspection_enabled = is_true(common.env(
+            'OS_INSPECTION_ENABLED', default='False'))
 
         parser.add_argument('--os-inspection-enabled',
                             default=inspection_enabled,
@@ -86,26 +129,23 @@ class IronicOneView(object):
                                  "enroll nodes without hardware properties. "
                                  "Defaults to env[OS_INSPECTION_ENABLED]")
 
+        # NOTE: unlike the other underscore spellings, this one takes a
+        # value, so it is kept as a separate option.
         parser.add_argument('--os_inspection_enabled',
+                            type=is_true,
                             help=argparse.SUPPRESS)
 
-        parser.add_argument('--os-cert',
+        parser.add_argument('--os-cert', '--os_cert',
                             default=common.env('OS_CERT'),
                             help='Path to OpenStack certificate file. Defaults'
                                  'to env[OS_CERT]')
 
-        parser.add_argument('--os_cert',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-cacert',
+        parser.add_argument('--os-cacert', '--os_cacert',
                             metavar='<os-ca-bundle-file>',
                             default=common.env('OS_CACERT'),
                             help='Path to OpenStack CA certificate bundle '
                                  'file. Defaults to env[OS_CACERT]')
 
-        parser.add_argument('--os_cacert',
-                            help=argparse.SUPPRESS)
-
         parser.add_argument('-h', '--help',
                             action='store_true',
                             help=argparse.SUPPRESS,
@@ -115,251 +155,170 @@ class IronicOneView(object):
                             action='version',
                             version=ironic_oneview_cli.__version__)
 
-        parser.add_argument('--os-username',
+        parser.add_argument('--os-username', '--os_username',
                             default=common.env('OS_USERNAME'),
                             help='OpenStack username. '
                                  'Defaults to env[OS_USERNAME]')
 
-        parser.add_argument('--os_username',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-password',
+        parser.add_argument('--os-password', '--os_password',
                             default=common.env('OS_PASSWORD'),
                             help='OpenStack password. '
                                  'Defaults to env[OS_PASSWORD]')
 
-        parser.add_argument('--os_password',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-tenant-id',
+        parser.add_argument('--os-tenant-id', '--os_tenant_id',
                             default=common.env('OS_TENANT_ID'),
                             help='OpenStack tenant id. '
                                  'Defaults to env[OS_TENANT_ID]')
 
-        parser.add_argument('--os_tenant_id',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-tenant-name',
+        parser.add_argument('--os-tenant-name', '--os_tenant_name',
                             default=common.env('OS_TENANT_NAME'),
                             help='OpenStack tenant name. '
                                  'Defaults to env[OS_TENANT_NAME]')
 
-        parser.add_argument('--os_tenant_name',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-project-id',
+        parser.add_argument('--os-project-id', '--os_project_id',
                             default=common.env('OS_PROJECT_ID'),
                             help='OpenStack project id. '
                                  'Defaults to env[OS_PROJECT_ID]')
 
-        parser.add_argument('--os_project_id',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-project-name',
+        parser.add_argument('--os-project-name', '--os_project_name',
                             default=common.env('OS_PROJECT_NAME'),
                             help='OpenStack project name. '
                                  'Defaults to env[OS_PROJECT_NAME]')
 
-        parser.add_argument('--os_project_name',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ironic-url',
+        parser.add_argument('--ironic-url', '--ironic_url',
                             default=common.env('IRONIC_URL'),
                             help='Ironic endpoint url'
                                  'Defaults to env[IRONIC_URL]')
 
-        parser.add_argument('--ironic_url',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-region-name',
+        parser.add_argument('--os-region-name', '--os_region_name',
                             default=common.env('OS_REGION_NAME'),
                             help='OpenStack region name. '
                                  'Defaults to env[OS_REGION_NAME]')
 
-        parser.add_argument('--os_region_name',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ironic-api-version',
+        parser.add_argument('--ironic-api-version', '--ironic_api_version',
                             default=common.env(
                                 'IRONIC_API_VERSION', default='1.31'),
                             help='Accepts 1.x (where "x" is microversion) '
                                  'or "latest", Defaults to '
                                  'env[IRONIC_API_VERSION] or 1.31')
 
-        parser.add_argument('--ironic_api_version',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-service-type',
+        parser.add_argument('--os-service-type', '--os_service_type',
                             default=common.env('OS_SERVICE_TYPE'),
                             help='Defaults to env[OS_SERVICE_TYPE] or '
                                  '"baremetal"')
 
-        parser.add_argument('--os_service_type',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-endpoint-type',
+        parser.add_argument('--os-endpoint-type', '--os_endpoint_type',
                             default=common.env('OS_ENDPOINT_TYPE'),
                             help='Defaults to env[OS_ENDPOINT_TYPE] or '
                                  '"publicURL"')
 
-        parser.add_argument('--os_endpoint_type',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-user-domain-id',
+        parser.add_argument('--os-user-domain-id', '--os_user_domain_id',
                             default=common.env('OS_USER_DOMAIN_ID'),
                             help='OpenStack user domain id. '
                                  'Defaults to env[OS_USER_DOMAIN_ID]')
 
-        parser.add_argument('--os_user_domain_id',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-user-domain-name',
+        parser.add_argument('--os-user-domain-name', '--os_user_domain_name',
                             default=common.env('OS_USER_DOMAIN_NAME'),
                             help='Defaults to env[OS_USER_DOMAIN_NAME].')
 
-        parser.add_argument('--os_user_domain_name',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-project-domain-id',
+        parser.add_argument('--os-project-domain-id', '--os_project_domain_id',
                             default=common.env('OS_PROJECT_DOMAIN_ID'),
                             help='OpenStack project domain id. '
                                  'Defaults to env[OS_PROJECT_DOMAIN_ID]')
 
-        parser.add_argument('--os_project_domain_id',
-                            help=argparse.SUPPRESS)
-
         parser.add_argument('--os-project-domain-name',
+                            '--os_project_domain_name',
                             default=common.env('OS_PROJECT_DOMAIN_NAME'),
                             help='Defaults to env[OS_PROJECT_DOMAIN_NAME].')
 
-        parser.add_argument('--os_project_domain_name',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-auth-url',
+        parser.add_argument('--os-auth-url', '--os_auth_url',
                             default=common.env('OS_AUTH_URL'),
                             help='OpenStack authentication URL. '
                                  'Defaults to env[OS_AUTH_URL]')
 
-        parser.add_argument('--os_auth_url',
-                            help=argparse.SUPPRESS)
-
         # OneView Global arguments
-        parser.add_argument('--ov-username',
+        parser.add_argument('--ov-username', '--ov_username',
                             default=common.env('OV_USERNAME'),
                             help='OneView username. '
                                  'Defaults to env[OV_USERNAME]')
 
-        parser.add_argument('--ov_username',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ov-password',
+        parser.add_argument('--ov-password', '--ov_password',
                             default=common.env('OV_PASSWORD'),
                             help='OneView password. '
                                  'Defaults to env[OV_PASSWORD]')
 
-        parser.add_argument('--ov_password',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ov-auth-url',
+        parser.add_argument('--ov-auth-url', '--ov_auth_url',
                             default=common.env('OV_AUTH_URL'),
                             help='OneView authentication URL. '
                                  'Defaults to env[OV_AUTH_URL]')
 
-        parser.add_argument('--ov_auth_url',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ov-insecure',
+        parser.add_argument('--ov-insecure', '--ov_insecure',
                             default=common.env('OV_INSECURE'),
                             help='Option to allow insecure connection with '
                                  'OneView. Defaults to env[OV_INSECURE]')
 
-        parser.add_argument('--ov_insecure',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--ov-cacert',
+        parser.add_argument('--ov-cacert', '--ov_cacert',
                             default=common.env('OV_CACERT'),
                             help='Path to OneView CA certificate file. '
                                  'Defaults to env[OV_CACERT]')
 
-        parser.add_argument('--ov_cacert',
-                            help=argparse.SUPPRESS)
-
         # OpenStack Images arguments
         parser.add_argument('--os-ironic-node-driver',
+                            '--os_ironic_node_driver',
                             default=common.env('OS_IRONIC_NODE_DRIVER'),
                             help='Ironic driver for node creation. '
                                  'Defaults to env[OS_IRONIC_NODE_DRIVER]')
 
-        parser.add_argument('--os_ironic_node_driver',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-driver',
+        parser.add_argument('--os-driver', '--os_driver',
                             default=common.env('OS_DRIVER'),
                             help='Hardware type for node creation. '
                                  'Defaults to env[OS_DRIVER]')
 
-        parser.add_argument('--os_driver',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-power-interface',
+        parser.add_argument('--os-power-interface', '--os_power_interface',
                             default=common.env('OS_POWER_INTERFACE'),
                             help='Power interface for node creation. '
                                  'Defaults to env[OS_POWER_INTERFACE]')
 
-        parser.add_argument('--os_power_interface',
-                            help=argparse.SUPPRESS)
-
         parser.add_argument('--os-management-interface',
+                            '--os_management_interface',
                             default=common.env('OS_MANAGEMENT_INTERFACE'),
                             help='Management interface for node creation. '
                                  'Defaults to env[OS_MANAGEMENT_INTERFACE]')
 
-        parser.add_argument('--os_management_interface',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-inspect-interface',
+        parser.add_argument('--os-inspect-interface', '--os_inspect_interface',
                             default=common.env('OS_INSPECT_INTERFACE'),
                             help='Inspect interface for node creation. '
                                  'Defaults to env[OS_INSPECT_INTERFACE]')
 
-        parser.add_argument('--os_inspect_interface',
-                            help=argparse.SUPPRESS)
-
-        parser.add_argument('--os-deploy-interface',
+        parser.add_argument('--os-deploy-interface', '--os_deploy_interface',
                             default=common.env('OS_DEPLOY_INTERFACE'),
                             help='Deploy interface for node creation. '
                                  'Defaults to env[OS_DEPLOY_INTERFACE]')
 
-        parser.add_argument('--os_deploy_interface',
-                            help=argparse.SUPPRESS)
-
         parser.add_argument(
             '--os-ironic-deploy-kernel-uuid',
+            '--os_ironic_deploy_kernel_uuid',
             default=common.env('OS_IRONIC_DEPLOY_KERNEL_UUID'),
             help='Ironic deploy kernel image UUID. '
                  'Defaults to env[OS_IRONIC_DEPLOY_KERNEL_UUID]'
         )
 
-        parser.add_argument('--os_ironic_deploy_kernel_uuid',
-                            help=argparse.SUPPRESS)
-
         parser.add_argument(
             '--os-ironic-deploy-ramdisk-uuid',
+            '--os_ironic_deploy_ramdisk_uuid',
             default=common.env('OS_IRONIC_DEPLOY_RAMDISK_UUID'),
             help='Ironic deploy ramdisk image UUID. '
                  'Defaults to env[OS_IRONIC_DEPLOY_RAMDISK_UUID]'
         )
 
-        parser.add_argument('--os_ironic_deploy_ramdisk_uuid',
-                            help=argparse.SUPPRESS)
-
         return parser
 
-    def get_subcommand_parser(self, version):
-        parser = self.get_base_parser()
+    def get_subcommand_parser(self, version, command=None, parser=None):
+        if parser is None:
+            parser = self.get_base_parser()
         self.subcommands = {}
         subparsers = parser.add_subparsers(metavar='<subcommand>')
-        enhance_parser(parser, subparsers, self.subcommands)
+        enhance_parser(parser, subparsers, self.subcommands, command)
         define_commands_from_module(subparsers, self, self.subcommands)
         return parser
 
@@ -382,7 +341,10 @@ class IronicOneView(object):
     def main(self, argv):
         parser = self.get_base_parser()
         (options, args) = parser.parse_known_args(argv)
-        subcommand_parser = self.get_subcommand_parser(1)
+        command = get_command_name(args)
+        if command == 'help':
+            command = get_command_name(args[args.index(command) + 1:])
+        subcommand_parser = self.get_subcommand_parser(1, command, parser)
         self.parser = subcommand_parser
 
         if options.debug:
@@ -433,6 +395,10 @@ class IronicOneView(object):
                     "You must provide an auth url via either "
                     "--os-auth-url or via env[OS_AUTH_URL]")
 
+        if args.workers < 1:
+            raise exceptions.CommandError("The number of workers must be a "
+                                          "positive integer")
+
         if not args.ov_username:
             raise exceptions.CommandError("You must provide a username via "
                                           "either --ov-username or via "
@@ -514,13 +480,19 @@ class IronicOneView(object):
             'os_ironic_deploy_ramdisk_uuid', 'ironic_url', 'os_region_name',
             'ironic_api_version', 'os_service_type', 'os_project_domain_id',
             'os_user_domain_id', 'os_user_domain_name', 'os_project_domain_id',
-            'os_project_domain_name'
+            'os_project_domain_name', 'workers', 'cache_credentials',
+            'no_cache', 'refresh'
         )
 
         kwargs = {}
         for key in client_args:
             kwargs[key] = getattr(args, key)
 
+        args.credential_cache = None
+        if args.cache_credentials:
+            args.credential_cache = credential_cache.CredentialCache(
+                args.credential_cache_file)
+
         try:
             args.func(args)
         except exceptions.Unauthorized:
@@ -529,6 +501,17 @@ class IronicOneView(object):
         except exceptions.CommandError as e:
             subcommand_parser = self.subcommands[args.subparser_name]
             subcommand_parser.error(e)
+        finally:
+            if args.credential_cache is not None:
+                save_credential_cache(args.credential_cache)
+
+
+def save_credential_cache(cache):
+    try:
+        cache.save()
+    except (IOError, OSError) as e:
+        print("Could not save the credential cache to %s: %s" %
+              (cache.path, e), file=sys.stderr)
 
 
 def define_command(subparsers, command, callback, cmd_mapper):
@@ -564,17 +547,53 @@ def define_commands_from_module(subparsers, command_module, cmd_mapper):
         define_command(subparsers, command, callback, cmd_mapper)
 
 
-def enhance_parser(parser, subparsers, cmd_mapper):
-    for command_module in COMMAND_MODULES:
+def get_command_name(args):
+    """Return the first positional argument left by the base parser."""
+    for arg in args:
+        if not arg.startswith('-'):
+            return arg
+    return None
+
+
+def get_command_modules(command=None):
+    """Import the modules defining a command, or all of them.
+
+    :param command: command name; if unknown or None every command module
+        is imported, so that the help and usage messages are complete.
+    """
+    if command in COMMAND_MODULES:
+        module_names = [COMMAND_MODULES[command]]
+    else:
+        module_names = list(collections.OrderedDict.fromkeys(
+            COMMAND_MODULES.values()))
+    return [importutils.import_module(name) for name in module_names]
+
+
+def enhance_parser(parser, subparsers, cmd_mapper, command=None):
+    for command_module in get_command_modules(command):
         define_commands_from_module(subparsers, command_module, cmd_mapper)
 
 
+def is_true(value):
+    return value.lower() == 'true'
+
+
 class HelpFormatter(argparse.HelpFormatter):
     def start_section(self, heading):
         # Title-case the headings
         heading = '%s%s' % (heading[0].upper(), heading[1:])
         super(HelpFormatter, self).start_section(heading)
 
+    def _format_action_invocation(self, action):
+        # NOTE: underscore spellings of options are kept only for backward
+        # compatibility, so they are left out of the help.
+        option_strings = [option for option in action.option_strings
+                          if '_' not in option]
+        if option_strings and option_strings != action.option_strings:
+            action = copy.copy(action)
+            action.option_strings = option_strings
+        return super(HelpFormatter, self)._format_action_invocation(action)
+
 
 def main():
     try:
@@ -26,6 +26,7 @@ from ironic_oneview_cli.create_port_shell import (
     commands as port_create_cmd)
 from ironic_oneview_cli.delete_node_shell import (
     commands as delete_node_cmd)
+from ironic_oneview_cli import facade
 from ironic_oneview_cli.tests import stubs
 
 POOL_OF_STUB_IRONIC_NODES = [
@@ -420,11 +421,26 @@ STUB_PARAMETERS = stubs.StubParameters(
 )
 
 
+def _get_collection_page(facade_obj, resource_client, start, count, filters,
+                         fields):
+    # NOTE: projected listings are served from the mocked get_all which, as
+    # for the other listings, ignores the filters; name lookups excepted.
+    members = resource_client.get_all(filter=filters)
+    if isinstance(filters, str) and filters.startswith('name='):
+        members = [member for member in members
+                   if member.get('name') == filters[len('name='):].strip("'")]
+    return members[start:start + count]
+
+
 @mock.patch('ironic_oneview_cli.common.get_ironic_client')
 @mock.patch('ironic_oneview_cli.common.oneview_client.OneViewClient')
 class FunctionalTestIronicOneviewCli(unittest.TestCase):
 
     def setUp(self):
+        patcher = mock.patch.object(
+            facade.Facade, '_get_collection_page', _get_collection_page)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.args = argparse.Namespace(
             ov_auth_url='https://my-oneview',
             ov_username='ov-user',
@@ -459,6 +475,7 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
             ),
 
             all=False,
+            maintenance=False,
             server_profile_template_name=None,
             use_oneview_ml2_driver=False,
             classic=False,
@@ -468,7 +485,12 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
             name=None,
             node=None,
             server_hardware_uuid=None,
-            server_profile_template=None
+            server_profile_template=None,
+            workers=4,
+            no_cache=True,
+            refresh=False,
+            fields=None,
+            output_format='table'
         )
 
     @mock.patch('ironic_oneview_cli.common.builtin_input')
@@ -970,7 +992,7 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
             **attrs
         )
 
-    @mock.patch('ironic_oneview_cli.common.print_prompt')
+    @mock.patch('ironic_oneview_cli.common.print_formatted')
     def test_template_list(
         self, mock_prompt, mock_oneview_client, mock_ironic_client
     ):
@@ -983,8 +1005,8 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
         )
         create_node_cmd.do_server_profile_template_list(self.args)
 
-        mock_prompt.called_with(
-            POOL_OF_SERVER_PROFILE_TEMPLATE,
+        mock_prompt.assert_called_once_with(
+            mock.ANY,
             [
                 'uuid',
                 'name',
@@ -996,10 +1018,15 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
                 'Name',
                 'Enclosure Group Name',
                 'Server Hardware Type Name'
-            ]
+            ],
+            output_format='table',
+            sortby_index=1
         )
+        self.assertEqual(
+            [spt.get('uuid') for spt in POOL_OF_SERVER_PROFILE_TEMPLATE],
+            [spt.get('uuid') for spt in mock_prompt.call_args[0][0]])
 
-    @mock.patch('ironic_oneview_cli.common.print_prompt')
+    @mock.patch('ironic_oneview_cli.common.print_formatted')
     def test_hardware_list(
         self, mock_prompt, mock_oneview_client, mock_ironic_client
     ):
@@ -1015,8 +1042,8 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
         )
         create_node_cmd.do_server_hardware_list(self.args)
 
-        mock_prompt.called_with(
-            POOL_OF_SERVER_HARDWARE,
+        mock_prompt.assert_called_once_with(
+            mock.ANY,
             [
                 'uuid',
                 'name',
@@ -1032,10 +1059,16 @@ class FunctionalTestIronicOneviewCli(unittest.TestCase):
                 'CPUs',
                 'Memory MB',
                 'Local GB',
-                'Server Group Name',
+                'Enclosure Group Name',
                 'Server Hardware Type Name'
-            ]
+            ],
+            output_format='table'
         )
+        s_hardware_list = list(mock_prompt.call_args[0][0])
+        self.assertEqual(
+            [sh.get('uuid') for sh in POOL_OF_SERVER_HARDWARE],
+            [sh.get('uuid') for sh in s_hardware_list])
+        self.assertEqual(144, s_hardware_list[0].get('cpus'))
 
     def _create_attrs_for_port(self, server_hardware, ironic_node, mac=None):
         if not mac:
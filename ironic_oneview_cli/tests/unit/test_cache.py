@@ -0,0 +1,180 @@
+# Copyright 2017 Hewlett Packard Enterprise Development LP
+# Copyright 2017 Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from ironic_oneview_cli import cache
+
+
+class TestResourceCache(unittest.TestCase):
+    def setUp(self):
+        self.loader = mock.Mock(side_effect=lambda uri: {'uri': uri})
+
+    def test_get_loads_once(self):
+        resource_cache = cache.ResourceCache()
+
+        for _ in range(3):
+            resource = resource_cache.get('/rest/a', self.loader)
+
+        self.assertEqual({'uri': '/rest/a'}, resource)
+        self.loader.assert_called_once_with('/rest/a')
+        self.assertEqual(2, resource_cache.hits)
+        self.assertEqual(1, resource_cache.misses)
+
+    def test_get_evicts_least_recently_used(self):
+        resource_cache = cache.ResourceCache(max_size=2)
+
+        resource_cache.get('/rest/a', self.loader)
+        resource_cache.get('/rest/b', self.loader)
+        resource_cache.get('/rest/a', self.loader)
+        resource_cache.get('/rest/c', self.loader)
+
+        self.assertIn('/rest/a', resource_cache)
+        self.assertNotIn('/rest/b', resource_cache)
+        self.assertEqual(2, len(resource_cache))
+
+    @mock.patch.object(cache.time, 'time')
+    def test_get_reloads_expired_entry(self, mock_time):
+        resource_cache = cache.ResourceCache(ttl=10)
+
+        mock_time.return_value = 100
+        resource_cache.get('/rest/a', self.loader)
+        mock_time.return_value = 111
+        resource_cache.get('/rest/a', self.loader)
+
+        self.assertEqual(2, self.loader.call_count)
+        self.assertEqual(2, resource_cache.misses)
+
+    def test_get_caches_negative_results(self):
+        resource_cache = cache.ResourceCache(
+            is_negative=lambda error: isinstance(error, KeyError))
+        self.loader.side_effect = KeyError('/rest/a')
+
+        for _ in range(2):
+            self.assertRaises(
+                KeyError, resource_cache.get, '/rest/a', self.loader)
+
+        self.loader.assert_called_once_with('/rest/a')
+
+    def test_get_does_not_cache_other_errors(self):
+        resource_cache = cache.ResourceCache()
+        self.loader.side_effect = ValueError()
+
+        for _ in range(2):
+            self.assertRaises(
+                ValueError, resource_cache.get, '/rest/a', self.loader)
+
+        self.assertEqual(2, self.loader.call_count)
+
+    def test_invalidate(self):
+        resource_cache = cache.ResourceCache()
+        resource_cache.set('/rest/a', {})
+        resource_cache.set('/rest/b', {})
+
+        resource_cache.invalidate('/rest/a')
+        self.assertNotIn('/rest/a', resource_cache)
+        self.assertIn('/rest/b', resource_cache)
+
+        resource_cache.invalidate()
+        self.assertEqual(0, len(resource_cache))
+
+
+class TestInventoryCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.inventory_cache = cache.InventoryCache(self.directory)
+        self.loader = mock.Mock(return_value=[{'uri': '/rest/a'}])
+        self.get_version = mock.Mock(return_value=[1, 'etag'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _get(self, ttl=60):
+        return self.inventory_cache.get(
+            'server-hardware', 'all', self.loader, self.get_version, ttl)
+
+    def test_get_served_from_disk_within_ttl(self):
+        self._get()
+        members = cache.InventoryCache(self.directory).get(
+            'server-hardware', 'all', self.loader, self.get_version, 60)
+
+        self.assertEqual([{'uri': '/rest/a'}], members)
+        self.loader.assert_called_once_with()
+        self.get_version.assert_called_once_with()
+
+        path = os.path.join(self.directory, 'server-hardware', 'all.json')
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+
+    def test_get_revalidates_expired_entry(self):
+        self._get(ttl=0)
+        self._get(ttl=0)
+
+        self.loader.assert_called_once_with()
+        self.assertEqual(2, self.get_version.call_count)
+
+    def test_get_reloads_changed_collection(self):
+        self._get(ttl=0)
+        self.get_version.return_value = [2, 'other-etag']
+        self._get(ttl=0)
+
+        self.assertEqual(2, self.loader.call_count)
+
+    def test_iter_streams_members(self):
+        self.loader.return_value = iter(
+            [{'uri': '/rest/a'}, {'uri': '/rest/b'}])
+        members = self.inventory_cache.iter(
+            'server-hardware', 'all', self.loader, self.get_version, 60)
+
+        self.assertEqual({'uri': '/rest/a'}, next(members))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'server-hardware', 'all.json')))
+        self.assertEqual([{'uri': '/rest/b'}], list(members))
+        self.assertEqual(
+            [{'uri': '/rest/a'}, {'uri': '/rest/b'}], self._get())
+        self.loader.assert_called_once_with()
+
+    def test_iter_does_not_store_partial_listing(self):
+        members = self.inventory_cache.iter(
+            'server-hardware', 'all', self.loader, self.get_version, 60)
+        next(members)
+        members.close()
+
+        self._get()
+
+        self.assertEqual(2, self.loader.call_count)
+        self.assertEqual(
+            ['all.json', 'all.members'],
+            sorted(os.listdir(
+                os.path.join(self.directory, 'server-hardware'))))
+
+    def test_get_refresh(self):
+        self._get()
+        self.inventory_cache.refresh = True
+        self._get()
+
+        self.assertEqual(2, self.loader.call_count)
+
+    def test_invalidate(self):
+        self._get()
+        self.inventory_cache.invalidate('server-hardware')
+        self._get()
+
+        self.assertEqual(2, self.loader.call_count)
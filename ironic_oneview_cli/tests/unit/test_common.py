@@ -15,7 +15,10 @@
 #    under the License.
 
 import argparse
+import json
 import mock
+import six
+import time
 import unittest
 
 from oslo_utils import importutils
@@ -70,3 +73,300 @@ class TestUtils(unittest.TestCase):
         }
         common.get_hponeview_client(self.args)
         mock_oneview.assert_called_once_with(config)
+
+    @mock.patch.object(hponeview_client, 'OneViewClient', autospec=True)
+    def test_get_hponeview_client_cached_session(self, mock_oneview):
+        self.args.credential_cache = mock.Mock()
+        self.args.credential_cache.get.return_value = 'session-id'
+
+        client = common.get_hponeview_client(self.args)
+
+        config = mock_oneview.call_args[0][0]
+        self.assertEqual('session-id', config['credentials']['sessionID'])
+        self.assertEqual(1, mock_oneview.call_count)
+        self.args.credential_cache.track.assert_called_once_with(
+            'oneview', mock.ANY, client.connection.get_session_id)
+
+    @mock.patch.object(hponeview_client, 'OneViewClient', autospec=True)
+    def test_get_hponeview_client_expired_session(self, mock_oneview):
+        self.args.credential_cache = mock.Mock()
+        self.args.credential_cache.get.return_value = 'session-id'
+        mock_oneview.side_effect = [
+            common.oneview_exceptions.HPOneViewException('Unauthorized'),
+            mock.DEFAULT]
+
+        common.get_hponeview_client(self.args)
+
+        self.assertEqual(2, mock_oneview.call_count)
+        config = mock_oneview.call_args[0][0]
+        self.assertNotIn('sessionID', config['credentials'])
+        self.args.credential_cache.invalidate.assert_called_once_with(
+            'oneview', mock.ANY)
+
+    @mock.patch.object(common, 'session')
+    @mock.patch.object(common, 'loading')
+    @mock.patch.object(common, 'nova_client')
+    @mock.patch.object(common, 'ironic_client')
+    def test_openstack_clients_share_keystone_session(
+        self, mock_ironic, mock_nova, mock_loading, mock_session
+    ):
+        args = argparse.Namespace(
+            ironic_url=None, os_auth_url='http://keystone', os_username='u',
+            os_password='p', os_user_domain_id=None, os_user_domain_name=None,
+            os_project_id=None, os_tenant_id=None, os_project_name='p',
+            os_tenant_name=None, os_project_domain_id=None,
+            os_project_domain_name=None, insecure=False, os_cacert=None,
+            os_cert=None, os_region_name=None, os_service_type=None,
+            os_endpoint_type=None, ironic_api_version='1.31',
+            credential_cache=mock.Mock())
+        args.credential_cache.get.return_value = 'auth-state'
+
+        common.get_ironic_client(args)
+        common.get_nova_client(args)
+
+        mock_session.Session.assert_called_once_with(
+            auth=mock.ANY, verify=True, cert=None)
+        sess = mock_session.Session.return_value
+        self.assertIs(
+            sess, mock_ironic.get_client.call_args[1]['session'])
+        mock_nova.Client.assert_called_once_with(
+            common.NOVA_API_VERSION, session=sess)
+        loader = mock_loading.get_plugin_loader.return_value
+        auth = loader.load_from_options.return_value
+        auth.set_auth_state.assert_called_once_with('auth-state')
+
+    def test_parallel_map_keeps_order(self):
+        def slow_double(value):
+            time.sleep(0.01 * (5 - value))
+            return value * 2
+
+        result = common.parallel_map(slow_double, range(5), workers=5)
+
+        self.assertEqual([0, 2, 4, 6, 8], result)
+
+    def test_parallel_map_serial(self):
+        self.assertEqual([1, 2], common.parallel_map(
+            lambda value: value + 1, [0, 1], workers=1))
+
+    def test_parallel_map_raises(self):
+        def fail_on_two(value):
+            if value == 2:
+                raise ValueError(value)
+            return value
+
+        self.assertRaises(
+            ValueError, common.parallel_map, fail_on_two, range(4), 2)
+
+    def test_iter_paginated(self):
+        items = list(range(5))
+        list_page = mock.Mock(side_effect=lambda marker, limit: [
+            item for item in items if marker is None or item > marker
+        ][:limit])
+
+        self.assertEqual(items, list(
+            common.iter_paginated(list_page, lambda item: item, 2)))
+        list_page.assert_has_calls([
+            mock.call(None, 2), mock.call(1, 2), mock.call(3, 2)])
+
+    def test_iter_paginated_holds_marker_until_next_page(self):
+        items = list(range(4))
+        requested = []
+
+        def list_page(marker, limit):
+            requested.append(marker)
+            # NOTE: the marker must still exist when it is requested.
+            self.assertTrue(marker is None or marker in items)
+            return [item for item in items
+                    if marker is None or item > marker][:limit]
+
+        for item in common.iter_paginated(list_page, lambda item: item, 2):
+            items.remove(item)
+
+        self.assertEqual([], items)
+        self.assertEqual([None, 1, 3], requested)
+
+    def test_iter_offset_paginated(self):
+        items = list(range(5))
+        list_page = mock.Mock(
+            side_effect=lambda start, count: items[start:start + count])
+
+        self.assertEqual(
+            items, list(common.iter_offset_paginated(list_page, 2)))
+        list_page.assert_has_calls([
+            mock.call(0, 2), mock.call(2, 2), mock.call(4, 2)])
+
+    @mock.patch('ironic_oneview_cli.common._print_text')
+    def test_print_stream(self, mock_print_text):
+        common.print_stream(
+            iter([{'name': 'a', 'cpus': 2}, {'name': 'longer', 'cpus': 4}]),
+            ['name', 'cpus'], ['Name', 'CPUs'], page_size=1)
+
+        self.assertEqual([
+            '+------+------+',
+            '| Name | CPUs |',
+            '+------+------+',
+            '| a    | 2    |',
+            '| longer | 4    |',
+            '+------+------+'
+        ], [call[0][0] for call in mock_print_text.call_args_list])
+
+
+class TestPrintFormatted(unittest.TestCase):
+    def setUp(self):
+        self.objs = [{'name': 'a', 'cpus': 2}, {'name': 'b,c', 'cpus': 4}]
+        self.fields = ['name', 'cpus']
+
+    def _print(self, objs, output_format):
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            common.print_formatted(
+                iter(objs), self.fields, ['Name', 'CPUs'], output_format)
+        return stdout.getvalue()
+
+    def test_print_json(self):
+        self.assertEqual(
+            [{'name': 'a', 'cpus': 2}, {'name': 'b,c', 'cpus': 4}],
+            json.loads(self._print(self.objs, 'json')))
+
+    def test_print_json_empty(self):
+        self.assertEqual([], json.loads(self._print([], 'json')))
+
+    def test_print_ndjson(self):
+        lines = self._print(self.objs, 'ndjson').splitlines()
+
+        self.assertEqual(
+            [{'name': 'a', 'cpus': 2}, {'name': 'b,c', 'cpus': 4}],
+            [json.loads(line) for line in lines])
+
+    def test_print_csv(self):
+        self.assertEqual(
+            ['name,cpus', 'a,2', '"b,c",4'],
+            self._print(self.objs, 'csv').splitlines())
+
+    @mock.patch.object(common, 'print_stream')
+    def test_print_table_streams(self, mock_print_stream):
+        objs = iter(self.objs)
+
+        common.print_formatted(objs, self.fields, ['Name', 'CPUs'])
+
+        mock_print_stream.assert_called_once_with(
+            objs, self.fields, ['Name', 'CPUs'])
+
+    def test_select_fields(self):
+        self.assertEqual(
+            (['cpus', 'name'], ['CPUs', 'Name']),
+            common.select_fields(
+                'cpus, name', self.fields, ['Name', 'CPUs']))
+        self.assertEqual(
+            (self.fields, ['Name', 'CPUs']),
+            common.select_fields(None, self.fields, ['Name', 'CPUs']))
+
+    def test_select_fields_invalid(self):
+        self.assertRaises(
+            exceptions.CommandError, common.select_fields,
+            'name,missing', self.fields, ['Name', 'CPUs'])
+
+
+class TestIndexedList(unittest.TestCase):
+    def setUp(self):
+        self.elements = common.IndexedList([
+            {'uuid': '1', 'name': 'first', 'uri': '/rest/1'},
+            {'uuid': '2', 'name': '1', 'uri': '/rest/2'},
+            {'uuid': '3', 'name': 'third', 'uri': '/rest/3'}])
+        common.assign_elements_with_new_id(self.elements)
+
+    def test_get_element(self):
+        self.assertEqual('3', common.get_element(
+            self.elements, '/rest/3')['uuid'])
+        self.assertEqual(3, common.get_element(
+            self.elements, 'third')['id'])
+        self.assertIsNone(common.get_element(self.elements, 'missing'))
+
+    def test_get_element_first_match_wins(self):
+        self.assertEqual(
+            'first', common.get_element(self.elements, '1')['name'])
+
+    def test_get_element_by_id(self):
+        self.assertEqual(
+            'third', common.get_element_by_id(self.elements, '3')['name'])
+        self.assertIsNone(common.get_element_by_id(self.elements, '4'))
+
+    def test_get_element_by_name(self):
+        self.assertEqual(
+            '2', common.get_element_by_name(self.elements, '1')['uuid'])
+
+    def test_get_element_plain_list(self):
+        self.assertEqual(
+            'third', common.get_element(list(self.elements), '3')['name'])
+
+    def test_is_entry_invalid(self):
+        self.assertFalse(common.is_entry_invalid(['1', '3'], self.elements))
+        self.assertTrue(common.is_entry_invalid(['1', '9'], self.elements))
+        self.assertTrue(common.is_entry_invalid([], self.elements))
+
+    def test_index_rebuilt_after_change(self):
+        self.assertIsNone(self.elements.find('name', 'fourth'))
+
+        self.elements.append({'uuid': '4', 'name': 'fourth'})
+
+        self.assertEqual('4', self.elements.find('name', 'fourth')['uuid'])
+
+    def test_index_built_once(self):
+        with mock.patch.object(
+            common, '_get_field', wraps=common._get_field
+        ) as mock_get_field:
+            for element_id in ('1', '2', '3'):
+                common.get_element_by_id(self.elements, element_id)
+
+        self.assertEqual(3, mock_get_field.call_count)
+
+
+class TestServerProfileCompatible(unittest.TestCase):
+    def test_matches_type_and_group_pairs(self):
+        server_hardware = [
+            {'serverHardwareTypeUri': 'sht1', 'serverGroupUri': 'eg1'},
+            {'serverHardwareTypeUri': 'sht2', 'serverGroupUri': 'eg2'},
+            {'serverHardwareTypeUri': 'sht3', 'serverGroupUri': None}]
+        templates = [
+            {'name': 'b', 'serverHardwareTypeUri': 'sht2',
+             'enclosureGroupUri': 'eg2'},
+            {'name': 'a', 'serverHardwareTypeUri': 'sht1',
+             'enclosureGroupUri': 'eg1'},
+            {'name': 'mixed', 'serverHardwareTypeUri': 'sht1',
+             'enclosureGroupUri': 'eg2'},
+            {'name': 'rack', 'serverHardwareTypeUri': 'sht3',
+             'enclosureGroupUri': None}]
+
+        compatible = common.get_server_profile_compatible(
+            templates, server_hardware)
+
+        self.assertEqual(
+            ['a', 'b', 'rack'], [spt['name'] for spt in compatible])
+
+    def test_reads_each_object_once(self):
+        lookups = []
+
+        class CountingDict(dict):
+            def get(self, key, default=None):
+                lookups.append(key)
+                return super(CountingDict, self).get(key, default)
+
+        server_hardware = [
+            CountingDict(serverHardwareTypeUri='sht%s' % i,
+                         serverGroupUri='eg%s' % (i % 20))
+            for i in range(10000)]
+        templates = [
+            CountingDict(name='spt%s' % i,
+                         serverHardwareTypeUri='sht%s' % (i * 17),
+                         enclosureGroupUri='eg%s' % (i % 25))
+            for i in range(1000)]
+
+        compatible = common.get_server_profile_compatible(
+            templates, server_hardware)
+
+        self.assertEqual(24, len(compatible))
+        # NOTE: matching every template against every Server Hardware would
+        # read millions of attributes; each pair is read once instead, and
+        # the names of the compatible templates once for sorting.
+        self.assertEqual(
+            2 * len(server_hardware) + 2 * len(templates) + len(compatible),
+            len(lookups))
@@ -0,0 +1,75 @@
+# Copyright 2017 Hewlett Packard Enterprise Development LP
+# Copyright 2017 Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from ironic_oneview_cli import credential_cache
+
+
+class TestCredentialCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cli', 'credentials.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load(self):
+        cache = credential_cache.CredentialCache(self.path)
+        cache.set(credential_cache.ONEVIEW, 'key', 'session')
+        cache.save()
+
+        cache = credential_cache.CredentialCache(self.path)
+        self.assertEqual(
+            'session', cache.get(credential_cache.ONEVIEW, 'key'))
+
+    def test_save_restricts_permissions(self):
+        cache = credential_cache.CredentialCache(self.path)
+        cache.save()
+
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        self.assertEqual(0o600, mode)
+
+    def test_save_stores_tracked_values(self):
+        tokens = iter(['old-token', 'new-token'])
+        cache = credential_cache.CredentialCache(self.path)
+        cache.track(credential_cache.KEYSTONE, 'key', lambda: next(tokens))
+        next(tokens)
+        cache.save()
+
+        self.assertEqual(
+            'new-token', cache.get(credential_cache.KEYSTONE, 'key'))
+
+    def test_load_ignores_corrupted_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as cache_file:
+            cache_file.write('{not json')
+
+        cache = credential_cache.CredentialCache(self.path)
+
+        self.assertIsNone(cache.get(credential_cache.KEYSTONE, 'key'))
+
+    def test_get_cache_key(self):
+        self.assertNotEqual(
+            credential_cache.get_cache_key('a', 'b'),
+            credential_cache.get_cache_key('b', 'a'))
+        self.assertEqual(
+            credential_cache.get_cache_key('a', None),
+            credential_cache.get_cache_key('a', None))
@@ -0,0 +1,453 @@
+# Copyright 2017 Hewlett Packard Enterprise Development LP
+# Copyright 2017 Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+import mock
+import shutil
+import tempfile
+import time
+import unittest
+
+from ironic_oneview_cli import cache
+from ironic_oneview_cli import exceptions
+from ironic_oneview_cli import facade
+
+
+@mock.patch('ironic_oneview_cli.common.get_hponeview_client')
+@mock.patch('ironic_oneview_cli.common.get_nova_client')
+@mock.patch('ironic_oneview_cli.common.get_ironic_client')
+class TestFacade(unittest.TestCase):
+    def test_clients_created_lazily(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        facade_obj = facade.Facade(mock.Mock())
+
+        mock_ironic.assert_not_called()
+        mock_nova.assert_not_called()
+        mock_oneview.assert_not_called()
+
+        facade_obj.node_delete('123')
+        facade_obj.node_delete('456')
+
+        mock_ironic.assert_called_once_with(facade_obj.args)
+        mock_nova.assert_not_called()
+        mock_oneview.assert_not_called()
+        self.assertEqual(2, mock_ironic.return_value.node.delete.call_count)
+
+    def test_iter_oneview_nodes(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        node = mock.Mock(uuid='1')
+        mock_ironic.return_value.node.list.side_effect = (
+            lambda driver, fields, marker, limit:
+                [node] if driver == 'oneview' else [])
+        facade_obj = facade.Facade(mock.Mock())
+
+        nodes = list(facade_obj.iter_oneview_nodes())
+
+        self.assertEqual([node], nodes)
+        mock_ironic.return_value.node.list.assert_any_call(
+            driver='oneview', fields=facade.ONEVIEW_NODE_FIELDS,
+            marker=None, limit=facade.IRONIC_PAGE_SIZE)
+        self.assertEqual(4, mock_ironic.return_value.node.list.call_count)
+
+    @mock.patch.object(facade, 'IRONIC_PAGE_SIZE', 2)
+    def test_iter_ironic_ports_by_page(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        ports = [mock.Mock(uuid=str(i)) for i in range(3)]
+        mock_ironic.return_value.port.list.side_effect = [ports[:2], ports[2:]]
+        facade_obj = facade.Facade(mock.Mock())
+
+        self.assertEqual(ports, list(facade_obj.iter_ironic_ports('node')))
+        mock_ironic.return_value.port.list.assert_has_calls([
+            mock.call(node='node', detail=True, marker=None, limit=2),
+            mock.call(node='node', detail=True, marker='1', limit=2)])
+
+    def test_iter_server_hardware_projected(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware.URI = '/rest/server-hardware'
+        oneview_client.connection.get.return_value = {
+            'members': [{'uri': '/rest/server-hardware/1'}]}
+        facade_obj = facade.Facade(mock.Mock(no_cache=True))
+
+        server_hardware = list(facade_obj.iter_server_hardware(
+            "serverGroupUri='/rest/enclosure-groups/1'"))
+
+        self.assertEqual([{'uri': '/rest/server-hardware/1'}],
+                         server_hardware)
+        oneview_client.connection.get.assert_called_once_with(
+            '/rest/server-hardware?start=0&count=100&sort=name:ascending'
+            '&filter=serverGroupUri%3D%27/rest/enclosure-groups/1%27'
+            '&fields=' + ','.join(facade.SERVER_HARDWARE_FIELDS))
+        oneview_client.server_hardware.get_all.assert_not_called()
+
+    @mock.patch.object(facade, 'ONEVIEW_PAGE_SIZE', 3)
+    def test_iter_server_hardware_capped_pages(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware.URI = '/rest/server-hardware'
+        members = [{'uri': '/rest/server-hardware/%s' % i} for i in range(5)]
+
+        def get(uri):
+            # NOTE: the appliance returns at most two members per request.
+            query = dict(param.split('=', 1)
+                         for param in uri.split('?')[1].split('&'))
+            start = int(query['start'])
+            end = min(start + int(query['count']), start + 2)
+            return {'members': members[start:end], 'total': len(members),
+                    'nextPageUri': '/next' if end < len(members) else None}
+
+        oneview_client.connection.get.side_effect = get
+        facade_obj = facade.Facade(mock.Mock(no_cache=True))
+
+        self.assertEqual(members, list(facade_obj.iter_server_hardware()))
+        self.assertEqual(
+            ['start=0&count=3', 'start=2&count=1', 'start=3&count=3'],
+            [call[0][0].split('?')[1].split('&sort')[0]
+             for call in oneview_client.connection.get.call_args_list])
+
+    def test_load_server_hardware_port_maps(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware.get.side_effect = lambda uuid: {
+            'uri': '/rest/server-hardware/%s' % uuid,
+            'portMap': {'deviceSlots': [uuid]}}
+        server_hardware_list = [
+            {'uri': '/rest/server-hardware/1'},
+            {'uri': '/rest/server-hardware/2', 'portMap': None}]
+
+        facade.Facade(mock.Mock()).load_server_hardware_port_maps(
+            server_hardware_list)
+
+        self.assertEqual({'deviceSlots': ['1']},
+                         server_hardware_list[0]['portMap'])
+        self.assertIsNone(server_hardware_list[1]['portMap'])
+        oneview_client.server_hardware.get.assert_called_once_with('1')
+
+    def test_load_server_hardware_port_maps_records_errors(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+
+        def get_server_hardware(uuid):
+            if uuid == '1':
+                raise Exception('Service Unavailable')
+            return {'portMap': {'deviceSlots': [uuid]}}
+
+        oneview_client.server_hardware.get.side_effect = get_server_hardware
+        server_hardware_list = [
+            {'uri': '/rest/server-hardware/1'},
+            {'uri': '/rest/server-hardware/2'}]
+
+        errors = facade.Facade(mock.Mock()).load_server_hardware_port_maps(
+            server_hardware_list, workers=2)
+
+        self.assertEqual(['/rest/server-hardware/1'], list(errors))
+        self.assertNotIn('portMap', server_hardware_list[0])
+        self.assertEqual({'deviceSlots': ['2']},
+                         server_hardware_list[1]['portMap'])
+
+    def test_list_templates_compatible_with_server_hardware(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_profile_templates.URI = (
+            '/rest/server-profile-templates')
+        template = {'name': 'spt', 'serverHardwareTypeUri': '/rest/sht/1',
+                    'enclosureGroupUri': '/rest/eg/1'}
+        oneview_client.connection.get.return_value = {'members': [template]}
+        server_hardware = {'serverHardwareTypeUri': '/rest/sht/1',
+                           'serverGroupUri': '/rest/eg/1'}
+        facade_obj = facade.Facade(mock.Mock(no_cache=True))
+
+        templates = facade_obj.list_templates_compatible([server_hardware])
+
+        self.assertEqual([template], templates)
+        uri = oneview_client.connection.get.call_args[0][0]
+        self.assertIn('filter=serverHardwareTypeUri%3D%27/rest/sht/1%27', uri)
+        self.assertIn('filter=enclosureGroupUri%3D%27/rest/eg/1%27', uri)
+        oneview_client.server_hardware.get_all.assert_not_called()
+
+    def test_find_server_profile_template_by_name(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.connection.get.return_value = {
+            'members': [{'name': 'spt'}]}
+        facade_obj = facade.Facade(mock.Mock())
+
+        self.assertEqual({'name': 'spt'},
+                         facade_obj.find_server_profile_template('spt'))
+        self.assertEqual(1, oneview_client.connection.get.call_count)
+        oneview_client.server_profile_templates.get.assert_not_called()
+
+    def test_find_server_profile_template_by_name_with_quote(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_profile_templates.URI = (
+            '/rest/server-profile-templates')
+        oneview_client.connection.get.return_value = {
+            'members': [{'name': 'spt'}, {'name': "o'spt"}]}
+        facade_obj = facade.Facade(mock.Mock())
+
+        self.assertEqual({'name': "o'spt"},
+                         facade_obj.find_server_profile_template("o'spt"))
+        uri = oneview_client.connection.get.call_args[0][0]
+        self.assertNotIn('filter=', uri)
+        oneview_client.server_profile_templates.get.assert_not_called()
+
+    def test_find_server_profile_template_by_uuid(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_profile_templates.URI = (
+            '/rest/server-profile-templates')
+        oneview_client.connection.get.return_value = {'members': []}
+        oneview_client.server_profile_templates.get.return_value = {
+            'uri': '/rest/server-profile-templates/123'}
+        facade_obj = facade.Facade(mock.Mock())
+
+        template = facade_obj.find_server_profile_template('123')
+
+        self.assertEqual('/rest/server-profile-templates/123',
+                         template['uri'])
+        oneview_client.server_profile_templates.get.assert_called_once_with(
+            '123')
+
+    def test_find_server_profile_template_not_found(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_profile_templates.get.side_effect = (
+            exceptions.OneViewResourceNotFoundError('Not found'))
+        facade_obj = facade.Facade(mock.Mock())
+
+        self.assertIsNone(facade_obj.find_server_profile_template(
+            '/rest/server-profile-templates/123'))
+        oneview_client.connection.get.assert_not_called()
+
+    def test_get_enclosure_group_cached(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        facade_obj = facade.Facade(mock.Mock())
+
+        for _ in range(3):
+            facade_obj.get_enclosure_group('/rest/enclosure-groups/123')
+
+        oneview_client.enclosure_groups.get.assert_called_once_with('123')
+
+    def test_get_server_hardware_type_not_found_cached(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware_types.get.side_effect = (
+            exceptions.OneViewResourceNotFoundError('not found'))
+        facade_obj = facade.Facade(mock.Mock())
+
+        for _ in range(2):
+            self.assertRaises(
+                exceptions.OneViewResourceNotFoundError,
+                facade_obj.get_server_hardware_type,
+                '/rest/server-hardware-types/123')
+
+        self.assertEqual(
+            1, oneview_client.server_hardware_types.get.call_count)
+
+    def test_preload_reference_data(
+        self, mock_ironic, mock_nova, mock_oneview
+    ):
+        oneview_client = mock_oneview.return_value
+        oneview_client.enclosure_groups.get_all.return_value = [
+            {'uri': '/rest/enclosure-groups/1', 'name': 'EG1'},
+            {'uri': '/rest/enclosure-groups/2', 'name': 'EG2'}]
+        oneview_client.server_hardware_types.get_all.return_value = [
+            {'uri': '/rest/server-hardware-types/1', 'name': 'SHT1'}]
+        facade_obj = facade.Facade(mock.Mock())
+
+        facade_obj.preload_reference_data()
+        enclosure_group = facade_obj.get_enclosure_group(
+            '/rest/enclosure-groups/2')
+        server_hardware_type = facade_obj.get_server_hardware_type(
+            '/rest/server-hardware-types/1')
+
+        self.assertEqual('EG2', enclosure_group.get('name'))
+        self.assertEqual('SHT1', server_hardware_type.get('name'))
+        oneview_client.enclosure_groups.get.assert_not_called()
+        oneview_client.server_hardware_types.get.assert_not_called()
+
+
+@mock.patch('ironic_oneview_cli.common.get_ironic_client')
+@mock.patch('ironic_oneview_cli.common.get_hponeview_client')
+class TestFacadeInventoryCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch.object(
+            cache, 'get_cache_dir', return_value=self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.args = argparse.Namespace(
+            ov_auth_url='1.2.3.4', ov_username='user', no_cache=False,
+            refresh=False)
+
+    def _setup_oneview(self, mock_oneview):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware.URI = '/rest/server-hardware'
+        oneview_client.server_hardware.get_all.return_value = [
+            {'uri': '/rest/server-hardware/1'}]
+        oneview_client.connection.get.return_value = {
+            'total': 1, 'members': [{'eTag': '1', 'modified': 'today'}]}
+        return oneview_client
+
+    def test_server_hardware_listing_reused(self, mock_oneview, mock_ironic):
+        oneview_client = self._setup_oneview(mock_oneview)
+
+        for _ in range(2):
+            server_hardware = list(facade.Facade(
+                self.args).iter_server_hardware(fields=None))
+
+        self.assertEqual([{'uri': '/rest/server-hardware/1'}],
+                         server_hardware)
+        oneview_client.server_hardware.get_all.assert_called_once_with(
+            start=0, count=facade.ONEVIEW_PAGE_SIZE, filter='',
+            sort=facade.ONEVIEW_SORT)
+        oneview_client.connection.get.assert_called_once_with(
+            '/rest/server-hardware?start=0&count=1&sort=modified:descending')
+
+    def test_cache_hit_does_not_log_in(self, mock_oneview, mock_ironic):
+        oneview_client = self._setup_oneview(mock_oneview)
+        oneview_client.connection.get.return_value = {
+            'total': 1, 'members': [{'uri': '/rest/server-hardware/1'}]}
+        list(facade.Facade(self.args).iter_server_hardware())
+        mock_oneview.reset_mock()
+
+        server_hardware = list(facade.Facade(self.args).iter_server_hardware())
+
+        self.assertEqual([{'uri': '/rest/server-hardware/1'}],
+                         server_hardware)
+        mock_oneview.assert_not_called()
+
+    def test_invalidate_server_hardware(self, mock_oneview, mock_ironic):
+        oneview_client = self._setup_oneview(mock_oneview)
+        facade_obj = facade.Facade(self.args)
+
+        list(facade_obj.iter_server_hardware(fields=None))
+        facade_obj.invalidate_inventory('server-hardware')
+        list(facade_obj.iter_server_hardware(fields=None))
+
+        self.assertEqual(
+            2, oneview_client.server_hardware.get_all.call_count)
+
+    def test_listing_not_shared_between_users(
+        self, mock_oneview, mock_ironic
+    ):
+        oneview_client = self._setup_oneview(mock_oneview)
+
+        list(facade.Facade(self.args).iter_server_hardware(fields=None))
+        self.args.ov_username = 'other-user'
+        list(facade.Facade(self.args).iter_server_hardware(fields=None))
+
+        self.assertEqual(
+            2, oneview_client.server_hardware.get_all.call_count)
+
+    def test_no_cache(self, mock_oneview, mock_ironic):
+        oneview_client = self._setup_oneview(mock_oneview)
+        self.args.no_cache = True
+
+        for _ in range(2):
+            list(facade.Facade(self.args).iter_server_hardware(fields=None))
+
+        self.assertEqual(
+            2, oneview_client.server_hardware.get_all.call_count)
+        oneview_client.connection.get.assert_not_called()
+
+
+@mock.patch.object(facade, 'redfish')
+@mock.patch('ironic_oneview_cli.common.get_hponeview_client')
+class TestFacadeIlo(unittest.TestCase):
+    def _setup_ilo(self, mock_oneview, mock_redfish):
+        oneview_client = mock_oneview.return_value
+        oneview_client.server_hardware.get_remote_console_url.side_effect = (
+            lambda uri: {'remoteConsoleUrl': 'hplocons://addr=%s&sessionkey='
+                                             'token' % uri.split('/')[-1]})
+        ilo_client = mock_redfish.rest_client.return_value
+        ilo_client.get.return_value.text = (
+            '{"HostCorrelation": {"HostMACAddress": ["AA:BB:CC:DD:EE:FF"]}}')
+        return oneview_client, ilo_client
+
+    def test_mac_queried_once(self, mock_oneview, mock_redfish):
+        oneview_client, ilo_client = self._setup_ilo(
+            mock_oneview, mock_redfish)
+        facade_obj = facade.Facade(mock.Mock())
+        server_hardware = {'uri': '/rest/server-hardware/1.2.3.4'}
+
+        for _ in range(2):
+            self.assertEqual(
+                'AA:BB:CC:DD:EE:FF',
+                facade_obj.get_server_hardware_mac_from_ilo(server_hardware))
+
+        self.assertEqual(1, ilo_client.get.call_count)
+        mock_redfish.rest_client.assert_called_once_with(
+            base_url='https://1.2.3.4:443', sessionkey='token')
+
+    def test_ilo_sessions_pooled_and_logged_out(
+        self, mock_oneview, mock_redfish
+    ):
+        oneview_client, ilo_client = self._setup_ilo(
+            mock_oneview, mock_redfish)
+        facade_obj = facade.Facade(mock.Mock())
+        server_hardware = {'uri': '/rest/server-hardware/1.2.3.4'}
+
+        for _ in range(2):
+            facade_obj.get_ilorest_client(server_hardware)
+        facade_obj.logout_ilo_sessions()
+
+        self.assertEqual(1, mock_redfish.rest_client.call_count)
+        self.assertEqual(
+            1,
+            oneview_client.server_hardware.get_remote_console_url.call_count)
+        ilo_client.logout.assert_called_once_with()
+
+    def test_get_macs_from_ilo(self, mock_oneview, mock_redfish):
+        self._setup_ilo(mock_oneview, mock_redfish)
+        facade_obj = facade.Facade(mock.Mock())
+        server_hardware_list = [
+            {'uri': '/rest/server-hardware/10.0.0.%s' % i} for i in range(5)]
+
+        hardware_macs = facade_obj.get_server_hardware_macs_from_ilo(
+            server_hardware_list, workers=3)
+
+        self.assertEqual(5, len(hardware_macs))
+        self.assertEqual(5, mock_redfish.rest_client.call_count)
+
+    @mock.patch.object(facade, 'ILO_TIMEOUT', 0.01)
+    def test_ilo_timeout(self, mock_oneview, mock_redfish):
+        oneview_client, ilo_client = self._setup_ilo(
+            mock_oneview, mock_redfish)
+        ilo_client.get.side_effect = lambda path: time.sleep(1)
+        facade_obj = facade.Facade(mock.Mock())
+        server_hardware = {'uri': '/rest/server-hardware/1.2.3.4'}
+
+        self.assertRaises(
+            exceptions.OperationTimeoutError,
+            facade_obj.get_server_hardware_mac_from_ilo, server_hardware)
@@ -0,0 +1,142 @@
+# Copyright 2017 Hewlett Packard Enterprise Development LP
+# Copyright 2017 Universidade Federal de Campina Grande
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+import mock
+import subprocess
+import sys
+import unittest
+
+import ironic_oneview_cli
+from ironic_oneview_cli import shell
+
+BACKEND_MODULES = ('hpOneView', 'ironicclient', 'keystoneauth1',
+                   'novaclient', 'redfish')
+
+# NOTE: runs a command and then writes the names of the imported modules to
+# stderr, one per line.
+IMPORTED_MODULES_SCRIPT = """
+import sys
+from ironic_oneview_cli import shell
+try:
+    shell.IronicOneView().main(sys.argv[1:])
+finally:
+    sys.stderr.write('\\n'.join(sys.modules))
+"""
+
+
+def get_imported_modules(*args):
+    """Run a CLI command and return the names of the imported modules."""
+    process = subprocess.Popen(
+        [sys.executable, '-c', IMPORTED_MODULES_SCRIPT] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    _, stderr = process.communicate()
+    return set(stderr.splitlines())
+
+
+class TestShell(unittest.TestCase):
+    def test_version(self):
+        self.assertTrue(ironic_oneview_cli.__version__)
+
+    def test_get_command_name(self):
+        self.assertEqual(
+            'node-create',
+            shell.get_command_name(['--debug', 'node-create', '-n', '2']))
+        self.assertIsNone(shell.get_command_name(['--debug']))
+
+    def test_get_command_modules_of_command(self):
+        modules = shell.get_command_modules('node-delete')
+
+        self.assertEqual(
+            ['ironic_oneview_cli.delete_node_shell.commands'],
+            [module.__name__ for module in modules])
+
+    def test_get_command_modules_without_command(self):
+        modules = shell.get_command_modules()
+
+        self.assertEqual(5, len(modules))
+
+    def test_subcommand_parser_defines_selected_command(self):
+        ironic_oneview = shell.IronicOneView()
+
+        ironic_oneview.get_subcommand_parser(1, 'port-create')
+
+        self.assertEqual(
+            ['help', 'port-create'], sorted(ironic_oneview.subcommands))
+
+    @mock.patch('ironic_oneview_cli.genrc.commands.do_genrc')
+    def test_main_builds_base_parser_once(self, mock_genrc):
+        ironic_oneview = shell.IronicOneView()
+
+        with mock.patch.object(
+            ironic_oneview, 'get_base_parser',
+            wraps=ironic_oneview.get_base_parser
+        ) as mock_get_base_parser:
+            ironic_oneview.main(['genrc'])
+
+        mock_get_base_parser.assert_called_once_with()
+        mock_genrc.assert_called_once_with()
+
+    def test_underscore_options_are_aliases(self):
+        parser = shell.IronicOneView().get_subcommand_parser(1, 'genrc')
+
+        args = parser.parse_args(['--os_username', 'admin', 'genrc'])
+
+        self.assertEqual('admin', args.os_username)
+        self.assertNotIn('--os_username', parser.format_help())
+
+    def test_underscore_inspection_option_takes_value(self):
+        parser = shell.IronicOneView().get_subcommand_parser(1, 'genrc')
+
+        args = parser.parse_args(['--os_inspection_enabled', 'True', 'genrc'])
+        self.assertTrue(args.os_inspection_enabled)
+
+        args = parser.parse_args(['--os_inspection_enabled', 'False', 'genrc'])
+        self.assertFalse(args.os_inspection_enabled)
+
+        args = parser.parse_args(['--os-inspection-enabled', 'genrc'])
+        self.assertTrue(args.os_inspection_enabled)
+        self.assertNotIn('--os_inspection_enabled', parser.format_help())
+
+    def test_parser_build_adds_only_selected_command(self):
+        with mock.patch.object(
+            argparse._SubParsersAction, 'add_parser',
+            autospec=True, side_effect=argparse._SubParsersAction.add_parser
+        ) as mock_add_parser:
+            shell.IronicOneView().get_subcommand_parser(1, 'node-create')
+
+        # NOTE: only the commands of the node-create module are defined.
+        self.assertEqual(
+            ['help', 'node-create', 'server-hardware-list',
+             'server-profile-template-list'],
+            sorted(call[0][1] for call in mock_add_parser.call_args_list))
+
+
+class TestShellImports(unittest.TestCase):
+    def test_genrc_does_not_import_backends(self):
+        imported_modules = get_imported_modules('genrc')
+
+        self.assertIn('ironic_oneview_cli.shell', imported_modules)
+        for module in BACKEND_MODULES:
+            self.assertNotIn(module, imported_modules)
+
+    def test_help_does_not_import_backends(self):
+        imported_modules = get_imported_modules('help')
+
+        self.assertIn('ironic_oneview_cli.shell', imported_modules)
+        for module in BACKEND_MODULES:
+            self.assertNotIn(module, imported_modules)
@@ -14,7 +14,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import argparse
 import mock
+import time
 import unittest
 
 from ironic_oneview_cli import common
@@ -24,6 +26,10 @@ from ironic_oneview_cli.create_flavor_shell import (
     objects as flavor_objs)
 from ironic_oneview_cli.create_node_shell import (
     commands as create_node_cmd)
+from ironic_oneview_cli.create_port_shell import (
+    commands as create_port_cmd)
+from ironic_oneview_cli.delete_node_shell import (
+    commands as delete_node_cmd)
 from ironic_oneview_cli import facade
 from ironic_oneview_cli.tests import stubs
 
@@ -266,37 +272,218 @@ POOL_OF_STUB_NOVA_FLAVORS = [
 
 @mock.patch('ironic_oneview_cli.facade.Facade')
 class UnitTestIronicOneviewCli(unittest.TestCase):
-    @mock.patch.object(facade.Facade, 'get_ironic_node_list')
-    def test_get_oneview_nodes(self, mock_ironic_node_list, mock_facade):
+    def setUp(self):
+        self.create_args = argparse.Namespace(
+            name=None, mac=None, use_oneview_ml2_driver=False, classic=False,
+            os_inspection_enabled=True, os_driver='oneview',
+            os_power_interface='oneview', os_management_interface='oneview',
+            os_inspect_interface='oneview', os_deploy_interface='oneview',
+            os_ironic_deploy_kernel_uuid='kernel',
+            os_ironic_deploy_ramdisk_uuid='ramdisk')
+
+    def test_get_oneview_nodes(self, mock_facade):
         ironic_nodes = POOL_OF_STUB_IRONIC_NODES
-        mock_ironic_node_list.return_value = ironic_nodes
-        mock_facade.get_ironic_node_list = mock_ironic_node_list
         oneview_nodes = common.get_oneview_nodes(ironic_nodes)
 
         self.assertEqual(5, len(ironic_nodes))
         self.assertEqual(4, len(list(oneview_nodes)))
 
-    @mock.patch.object(facade.Facade, 'get_ironic_node_list')
-    def test_is_enrolled_on_ironic(self, mock_ironic_node_list, mock_facade):
+    @mock.patch.object(facade.Facade, 'iter_oneview_nodes')
+    def test_is_enrolled_on_ironic(self, mock_oneview_node_list, mock_facade):
         node_creator = create_node_cmd.NodeCreator(mock_facade)
         ironic_nodes = POOL_OF_STUB_IRONIC_NODES
-        mock_ironic_node_list.return_value = ironic_nodes
-        mock_facade.get_ironic_node_list = mock_ironic_node_list
+        mock_oneview_node_list.return_value = ironic_nodes
+        mock_facade.iter_oneview_nodes = mock_oneview_node_list
         server_hardware = POOL_OF_SERVER_HARDWARE[1]
 
         self.assertTrue(node_creator.is_enrolled_on_ironic(server_hardware))
 
-    @mock.patch.object(facade.Facade, 'get_ironic_node_list')
+    @mock.patch.object(facade.Facade, 'iter_oneview_nodes')
     def test_is_enrolled_on_ironic_false(
-        self, mock_ironic_node_list, mock_facade
+        self, mock_oneview_node_list, mock_facade
     ):
         node_creator = create_node_cmd.NodeCreator(mock_facade)
         ironic_nodes = POOL_OF_STUB_IRONIC_NODES
-        mock_ironic_node_list.return_value = ironic_nodes
-        mock_facade.get_ironic_node_list = mock_ironic_node_list
+        mock_oneview_node_list.return_value = ironic_nodes
+        mock_facade.iter_oneview_nodes = mock_oneview_node_list
         server_hardware = POOL_OF_SERVER_HARDWARE[0]
         self.assertFalse(node_creator.is_enrolled_on_ironic(server_hardware))
 
+    def test_is_enrolled_on_ironic_lists_nodes_once(self, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade)
+        mock_facade.iter_oneview_nodes.return_value = (
+            POOL_OF_STUB_IRONIC_NODES)
+
+        for server_hardware in POOL_OF_SERVER_HARDWARE:
+            node_creator.is_enrolled_on_ironic(server_hardware)
+
+        self.assertEqual(1, mock_facade.iter_oneview_nodes.call_count)
+
+    @mock.patch.object(create_node_cmd.port_cmd, 'PortCreator')
+    def test_create_nodes_updates_enrollment_index(
+        self, mock_port_creator, mock_facade
+    ):
+        node_creator = create_node_cmd.NodeCreator(mock_facade)
+        mock_facade.load_server_hardware_port_maps.return_value = {}
+        mock_facade.iter_oneview_nodes.return_value = []
+        server_hardware = POOL_OF_SERVER_HARDWARE[0]
+        self.assertFalse(node_creator.is_enrolled_on_ironic(server_hardware))
+
+        node_creator.create_nodes(
+            self.create_args, [server_hardware],
+            POOL_OF_SERVER_PROFILE_TEMPLATE[0])
+
+        self.assertTrue(node_creator.is_enrolled_on_ironic(server_hardware))
+        self.assertEqual(1, mock_facade.iter_oneview_nodes.call_count)
+
+    def test_create_nodes_reuses_server_hardware_for_port(self, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade)
+        mock_facade.load_server_hardware_port_maps.return_value = {}
+        mock_facade.iter_oneview_nodes.return_value = []
+        mock_facade.get_ironic_port_list.return_value = []
+        mock_facade.get_server_hardware_mac_from_ilo.return_value = (
+            'AA:BB:CC:DD:EE:FF')
+        server_hardware = dict(POOL_OF_SERVER_HARDWARE[0], portMap=None)
+
+        node_creator.create_nodes(
+            self.create_args, [server_hardware],
+            POOL_OF_SERVER_PROFILE_TEMPLATE[0])
+
+        mock_facade.get_server_hardware.assert_not_called()
+        mock_facade.get_server_hardware_mac_from_ilo.assert_called_once_with(
+            server_hardware)
+        self.assertEqual(
+            'AA:BB:CC:DD:EE:FF',
+            mock_facade.create_ironic_port.call_args[1]['address'])
+
+    def test_create_nodes_with_mac_loads_port_map(self, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade)
+        mock_facade.iter_oneview_nodes.return_value = []
+        mock_facade.get_ironic_port_list.return_value = []
+        port_map = {'deviceSlots': [{'physicalPorts': [{
+            'type': 'Ethernet', 'mac': 'AA:BB:CC:DD:EE:00',
+            'virtualPorts': [{'mac': 'AA:BB:CC:DD:EE:01'}]}]}]}
+
+        def load_server_hardware_port_maps(server_hardware_list, workers):
+            for server_hardware in server_hardware_list:
+                server_hardware['portMap'] = port_map
+            return {}
+
+        mock_facade.load_server_hardware_port_maps.side_effect = (
+            load_server_hardware_port_maps)
+        server_hardware = dict(POOL_OF_SERVER_HARDWARE[0])
+        del server_hardware['portMap']
+
+        self.create_args.mac = 'aa:bb:cc:dd:ee:01'
+        node_creator.create_nodes(
+            self.create_args, [server_hardware],
+            POOL_OF_SERVER_PROFILE_TEMPLATE[0])
+
+        self.assertEqual(
+            'aa:bb:cc:dd:ee:01',
+            mock_facade.create_ironic_port.call_args[1]['address'])
+
+    @mock.patch.object(create_node_cmd.port_cmd, 'PortCreator')
+    def test_create_nodes(self, mock_port_creator, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade, workers=4)
+        mock_facade.load_server_hardware_port_maps.return_value = {}
+        mock_facade.iter_oneview_nodes.return_value = (
+            POOL_OF_STUB_IRONIC_NODES)
+
+        def create_ironic_node(**attrs):
+            if attrs['name'] == 'RackServer':
+                raise Exception('Conflict')
+            return mock.Mock(uuid=attrs['name'])
+
+        mock_facade.create_ironic_node.side_effect = create_ironic_node
+        server_hardware_list = [POOL_OF_SERVER_HARDWARE[0],
+                                POOL_OF_SERVER_HARDWARE[0],
+                                POOL_OF_SERVER_HARDWARE[1],
+                                POOL_OF_SERVER_HARDWARE[3]]
+
+        created, failures = node_creator.create_nodes(
+            self.create_args, server_hardware_list,
+            POOL_OF_SERVER_PROFILE_TEMPLATE[0])
+
+        self.assertEqual(['AAAAA'], [node.uuid for node in created])
+        self.assertEqual(1, len(failures))
+        self.assertEqual(POOL_OF_SERVER_HARDWARE[3], failures[0][0])
+        self.assertEqual(2, mock_facade.create_ironic_node.call_count)
+        mock_facade.invalidate_inventory.assert_called_once_with(
+            'server-hardware')
+
+    @mock.patch.object(common, 'print_formatted')
+    def test_hardware_list_preloads_only_for_names(
+        self, mock_print_formatted, mock_facade
+    ):
+        facade_obj = mock_facade.return_value
+        facade_obj.list_templates_compatible.return_value = []
+        args = argparse.Namespace(
+            fields='uuid,name', output_format='json', workers=1,
+            server_profile_template=None)
+
+        create_node_cmd.do_server_hardware_list(args)
+        facade_obj.preload_reference_data.assert_not_called()
+
+        args.fields = 'name,enclosure_group_name'
+        create_node_cmd.do_server_hardware_list(args)
+        facade_obj.preload_reference_data.assert_called_once_with()
+
+    @mock.patch.object(common, 'print_formatted')
+    def test_template_list_preloads_only_for_names(
+        self, mock_print_formatted, mock_facade
+    ):
+        facade_obj = mock_facade.return_value
+        facade_obj.list_templates_compatible.return_value = []
+        args = argparse.Namespace(
+            fields='uuid,name', output_format='json', workers=1)
+
+        create_node_cmd.do_server_profile_template_list(args)
+        facade_obj.preload_reference_data.assert_not_called()
+
+        args.fields = None
+        create_node_cmd.do_server_profile_template_list(args)
+        facade_obj.preload_reference_data.assert_called_once_with()
+
+    def test_set_attributes_to_object_concurrently(self, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade, workers=4)
+        mock_facade.iter_oneview_nodes.return_value = (
+            POOL_OF_STUB_IRONIC_NODES)
+        mock_facade.get_enclosure_group.return_value = ENCLOSURE_GROUP
+        mock_facade.get_server_hardware_type.return_value = (
+            SERVER_HARDWARE_TYPE)
+        server_hardware_list = [dict(sh) for sh in POOL_OF_SERVER_HARDWARE]
+
+        node_creator.set_attributes_to_object(server_hardware_list)
+
+        self.assertEqual(
+            [sh['uri'] for sh in POOL_OF_SERVER_HARDWARE],
+            [sh['uri'] for sh in server_hardware_list])
+        self.assertEqual(
+            [False, True, True, False],
+            [sh['enrolled'] for sh in server_hardware_list])
+        for server_hardware in server_hardware_list:
+            self.assertEqual(144, server_hardware['cpus'])
+            self.assertEqual('ENCLGROUP',
+                             server_hardware['enclosure_group_name'])
+        self.assertEqual(1, mock_facade.iter_oneview_nodes.call_count)
+
+    def test_set_attributes_to_object_only_for_fields(self, mock_facade):
+        node_creator = create_node_cmd.NodeCreator(mock_facade)
+        mock_facade.get_enclosure_group.return_value = ENCLOSURE_GROUP
+        server_hardware_list = [dict(sh) for sh in POOL_OF_SERVER_HARDWARE]
+
+        node_creator.set_attributes_to_object(
+            server_hardware_list, ['id', 'name', 'enclosure_group_name'])
+
+        for server_hardware in server_hardware_list:
+            self.assertEqual('ENCLGROUP',
+                             server_hardware['enclosure_group_name'])
+            self.assertNotIn('cpus', server_hardware)
+            self.assertNotIn('enrolled', server_hardware)
+        mock_facade.get_server_hardware_type.assert_not_called()
+        mock_facade.iter_oneview_nodes.assert_not_called()
+
     def test_is_server_profile_applied(self, mock_facade):
         self.assertTrue(common.is_server_profile_applied(
             POOL_OF_SERVER_HARDWARE[1]))
@@ -305,16 +492,6 @@ class UnitTestIronicOneviewCli(unittest.TestCase):
         self.assertFalse(common.is_server_profile_applied(
             POOL_OF_SERVER_HARDWARE[0]))
 
-    def test_list_server_hardware(self, mock_facade):
-        mock_facade.filter_server_hardware_available.return_value = (
-            POOL_OF_SERVER_HARDWARE
-        )
-        server_hardware_objects = (
-            mock_facade.filter_server_hardware_available())
-
-        self.assertEqual(len(POOL_OF_SERVER_HARDWARE),
-                         len(server_hardware_objects))
-
     def test_get_flavor_from_ironic_node(self, mock_facade):
         mock_facade.get_server_hardware.return_value = (
             POOL_OF_SERVER_HARDWARE[0]
@@ -354,6 +531,89 @@ class UnitTestIronicOneviewCli(unittest.TestCase):
         self.assertEqual(result_flavor,
                          flavor_objs.Flavor(flavor_id=12345, info=flavor))
 
+    @staticmethod
+    def _get_flavor_nodes(count):
+        capabilities = ('server_hardware_type_uri:/rest/sht/1,'
+                        'server_profile_template_uri:/rest/spt/1')
+        nodes = []
+        for i in range(count):
+            nodes.append(stubs.StubIronicNode(
+                id=i, uuid=str(i), chassis_uuid=None, maintenance=False,
+                provision_state='enroll', ports=[], driver='oneview',
+                driver_info={'server_hardware_uri': '/rest/sh/%s' % i},
+                properties={'memory_mb': 32768 * (1 + i % 2),
+                            'cpus': 8 * (1 + i % 3), 'local_gb': 120,
+                            'cpu_arch': 'x86_64',
+                            'capabilities': capabilities},
+                name='node-%s' % i, extra={}))
+        return nodes
+
+    def _setup_flavor_facade(self, mock_facade):
+        def get_server_hardware(uri):
+            # NOTE: answer out of order to exercise concurrency.
+            time.sleep(0.001 * (int(uri.split('/')[-1]) % 3))
+            return POOL_OF_SERVER_HARDWARE[0]
+        mock_facade.get_server_hardware.side_effect = get_server_hardware
+        mock_facade.get_server_profile_template.return_value = (
+            POOL_OF_SERVER_PROFILE_TEMPLATE[0]
+        )
+
+    def test_get_flavor_list_resolves_once_per_group(self, mock_facade):
+        self._setup_flavor_facade(mock_facade)
+        nodes = self._get_flavor_nodes(12)
+
+        flavor_creator = create_flavor_cmd.FlavorCreator(mock_facade)
+        flavors = flavor_creator.get_flavor_list(nodes)
+
+        self.assertEqual(6, len(flavors))
+        self.assertEqual(6, mock_facade.get_server_hardware.call_count)
+        self.assertEqual(
+            6, mock_facade.get_server_profile_template.call_count)
+
+    def test_get_flavor_list_concurrently_sorted(self, mock_facade):
+        self._setup_flavor_facade(mock_facade)
+        nodes = self._get_flavor_nodes(12)
+
+        serial_flavors = create_flavor_cmd.FlavorCreator(
+            mock_facade, workers=1).get_flavor_list(nodes)
+        flavors = create_flavor_cmd.FlavorCreator(
+            mock_facade, workers=4).get_flavor_list(nodes)
+
+        self.assertEqual([repr(f) for f in serial_flavors],
+                         [repr(f) for f in flavors])
+        self.assertEqual(
+            [(8, 32768), (8, 65536), (16, 32768), (16, 65536), (24, 32768),
+             (24, 65536)],
+            [(flavor.cpus, flavor.ram_mb) for flavor in flavors])
+
+    def test_get_node_ports_filtered_by_ironic(self, mock_facade):
+        port_creator = create_port_cmd.PortCreator(mock_facade)
+        node = POOL_OF_STUB_IRONIC_NODES[0]
+
+        port_creator.get_node_ports(node)
+
+        mock_facade.get_ironic_port_list.assert_called_once_with(
+            node_uuid=node.uuid)
+
+    @mock.patch.object(create_port_cmd.PortCreator,
+                       'validate_server_hardware_mac', return_value=True)
+    def test_get_node_ports_from_index(self, mock_validate, mock_facade):
+        port_creator = create_port_cmd.PortCreator(
+            mock_facade, index_ports=True)
+        node, other_node = POOL_OF_STUB_IRONIC_NODES[:2]
+        mock_facade.iter_ironic_ports.return_value = iter([
+            mock.Mock(node_uuid=other_node.uuid)])
+        new_port = mock.Mock(node_uuid=node.uuid)
+        mock_facade.create_ironic_port.return_value = new_port
+        args = argparse.Namespace(mac='aa:bb:cc:dd:ee:ff')
+
+        self.assertEqual([], port_creator.get_node_ports(node))
+        self.assertEqual(1, len(port_creator.get_node_ports(other_node)))
+        port_creator.create_port(args, node)
+
+        self.assertEqual([new_port], port_creator.get_node_ports(node))
+        mock_facade.iter_ironic_ports.assert_called_once_with()
+
     def test_get_server_hardware_id_from_node(self, mock_facade):
         ironic_node = POOL_OF_STUB_IRONIC_NODES[1]
         sh_id = common.get_server_hardware_id_from_node(ironic_node)
@@ -374,3 +634,78 @@ class UnitTestIronicOneviewCli(unittest.TestCase):
                          common.normalize_logical_name('Enclosure1, bay 2'))
         self.assertEqual('blade2', common.normalize_logical_name('blade2'))
         self.assertEqual(None, common.normalize_logical_name(None))
+
+    def test_delete_nodes_collects_failures(self, mock_facade):
+        def node_delete(node_uuid):
+            if node_uuid == POOL_OF_STUB_IRONIC_NODES[1].uuid:
+                raise Exception('Node is associated with an instance')
+
+        mock_facade.node_delete.side_effect = node_delete
+        node_delete_obj = delete_node_cmd.NodeDelete(
+            mock_facade, workers=4, batch_size=2)
+
+        deleted, failures = node_delete_obj.delete_nodes(
+            POOL_OF_STUB_IRONIC_NODES)
+
+        self.assertEqual(len(POOL_OF_STUB_IRONIC_NODES) - 1, deleted)
+        self.assertEqual([POOL_OF_STUB_IRONIC_NODES[1]],
+                         [node for node, _ in failures])
+        self.assertEqual(len(POOL_OF_STUB_IRONIC_NODES),
+                         mock_facade.node_delete.call_count)
+        mock_facade.invalidate_inventory.assert_called_once_with(
+            'server-hardware')
+
+    def test_delete_n_nodes(self, mock_facade):
+        node_delete_obj = delete_node_cmd.NodeDelete(mock_facade)
+
+        deleted, failures = node_delete_obj.delete_n_nodes(
+            POOL_OF_STUB_IRONIC_NODES, 2)
+
+        self.assertEqual(2, deleted)
+        self.assertEqual([], failures)
+
+    def test_delete_nodes_sets_maintenance(self, mock_facade):
+        active_node = stubs.StubIronicNode(
+            id=6, uuid='66666666-2222-8888-9999-000000000000',
+            chassis_uuid=None, provision_state='active',
+            driver='oneview', ports=[], maintenance=False)
+        node_delete_obj = delete_node_cmd.NodeDelete(
+            mock_facade, maintenance=True)
+
+        deleted, failures = node_delete_obj.delete_nodes(
+            [active_node, POOL_OF_STUB_IRONIC_NODES[0]])
+
+        self.assertEqual(2, deleted)
+        mock_facade.node_set_maintenance.assert_called_once_with(
+            active_node.uuid, True, delete_node_cmd.MAINTENANCE_REASON)
+
+    def test_delete_nodes_skips_nodes_with_instance(self, mock_facade):
+        active_node = stubs.StubIronicNode(
+            id=6, uuid='66666666-2222-8888-9999-000000000000',
+            chassis_uuid=None, provision_state='active',
+            driver='oneview', ports=[], maintenance=False,
+            instance_uuid='1111-2222-3333-4444-5555')
+        node_delete_obj = delete_node_cmd.NodeDelete(
+            mock_facade, maintenance=True)
+
+        deleted, failures = node_delete_obj.delete_nodes([active_node])
+
+        self.assertEqual(0, deleted)
+        self.assertEqual([active_node], [node for node, _ in failures])
+        mock_facade.node_set_maintenance.assert_not_called()
+        mock_facade.node_delete.assert_not_called()
+
+    def test_delete_nodes_skips_maintenance_failures(self, mock_facade):
+        active_node = stubs.StubIronicNode(
+            id=6, uuid='66666666-2222-8888-9999-000000000000',
+            chassis_uuid=None, provision_state='active',
+            driver='oneview', ports=[], maintenance=False)
+        mock_facade.node_set_maintenance.side_effect = Exception('Locked')
+        node_delete_obj = delete_node_cmd.NodeDelete(
+            mock_facade, maintenance=True)
+
+        deleted, failures = node_delete_obj.delete_nodes([active_node])
+
+        self.assertEqual(0, deleted)
+        self.assertEqual([active_node], [node for node, _ in failures])
+        mock_facade.node_delete.assert_not_called()